@@ -1,8 +1,45 @@
+import sys
+
 from src.menu import Menu
 from src.camera import EmotionDetector
+from src.couch import CouchSession
 from src.data_manager import DataManager
 
 
+def print_session_summary(session_data):
+    """Muestra el resumen de una sesión guardada"""
+    title = "  📊 RESUMEN DE LA SESIÓN"
+    if session_data.get('player'):
+        title += f" - {session_data['player']}"
+    
+    print("\n" + "=" * 50)
+    print(title)
+    print("=" * 50)
+    
+    print(f"\nJuego: {session_data['game']}")
+    print(f"Duración: {session_data['duration_seconds'] // 60} min "
+          f"{session_data['duration_seconds'] % 60} seg")
+    
+    print("\n📈 Emociones detectadas:")
+    print(f"  😊 Feliz: {session_data['happy_count']} "
+          f"({session_data['happy_percentage']:.1f}%)")
+    print(f"  😠 Enfadado: {session_data['angry_count']} "
+          f"({session_data['angry_percentage']:.1f}%)")
+    print(f"  😐 Neutral: {session_data['neutral_count']} "
+          f"({session_data['neutral_percentage']:.1f}%)")
+    
+    # Índice de rage
+    rage_ratio = session_data['angry_percentage']
+    print(f"\n🔥 Rage Index: {rage_ratio:.1f}%")
+    
+    if rage_ratio > 50:
+        print("⚠️  ¡Nivel de rage muy alto!")
+    elif rage_ratio > 30:
+        print("⚠️  Nivel de rage moderado.")
+    else:
+        print("✅ Sesión tranquila.")
+
+
 def main():
     # Cabecera del programa
     print("\n" + "=" * 50)
@@ -11,6 +48,9 @@ def main():
     print("\nBienvenido al sistema de tracking de emociones")
     print("durante tus sesiones de juego.\n")
     
+    # Modo sofá: varios jugadores frente a la misma cámara
+    couch_mode = "--couch" in sys.argv
+    
     # Inicialización de componentes principales
     menu = Menu()
     data_manager = DataManager()
@@ -21,39 +61,17 @@ def main():
         return
     
     # Ejecución del detector de emociones
-    detector = EmotionDetector(selected_game)
-    session_data = detector.run()
+    if couch_mode:
+        sessions = CouchSession(selected_game).run() or []
+    else:
+        session_data = EmotionDetector(selected_game).run()
+        sessions = [session_data] if session_data else []
     
-    # Guardado y resumen de la sesión
-    if session_data:
-        data_manager.save_session(session_data)
-        
-        print("\n" + "=" * 50)
-        print("  📊 RESUMEN DE LA SESIÓN")
-        print("=" * 50)
-        
-        print(f"\nJuego: {session_data['game']}")
-        print(f"Duración: {session_data['duration_seconds'] // 60} min "
-              f"{session_data['duration_seconds'] % 60} seg")
-        
-        print("\n📈 Emociones detectadas:")
-        print(f"  😊 Feliz: {session_data['happy_count']} "
-              f"({session_data['happy_percentage']:.1f}%)")
-        print(f"  😠 Enfadado: {session_data['angry_count']} "
-              f"({session_data['angry_percentage']:.1f}%)")
-        print(f"  😐 Neutral: {session_data['neutral_count']} "
-              f"({session_data['neutral_percentage']:.1f}%)")
-        
-        # Índice de rage
-        rage_ratio = session_data['angry_percentage']
-        print(f"\n🔥 Rage Index: {rage_ratio:.1f}%")
-        
-        if rage_ratio > 50:
-            print("⚠️  ¡Nivel de rage muy alto!")
-        elif rage_ratio > 30:
-            print("⚠️  Nivel de rage moderado.")
-        else:
-            print("✅ Sesión tranquila.")
+    # Guardado y resumen de la sesión (una por jugador en modo sofá)
+    if sessions:
+        for session_data in sessions:
+            data_manager.save_session(session_data)
+            print_session_summary(session_data)
         
         print("\n✅ Sesión guardada.")
         print("\n💡 TIP: Ejecuta 'python web/dashboard_server.py' para ver el dashboard")
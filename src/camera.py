@@ -1,12 +1,29 @@
 import cv2
 import time
 from datetime import datetime
-import numpy as np
+
+from src.capture import FrameGrabber
+from src.emotion_history import EmotionHistory
+from src.face_features import FaceFeatures
+from src.face_tracker import FaceTracker
+from src.frame_source import CameraSource
+from src.live_status import LivePublisher
+from src.metrics import PipelineMetrics
+from src.overlay import OverlayCompositor
+from src.scheduler import AdaptiveScheduler
+from src.settings import load_settings
+
+
+# Alto de las capas del overlay: panel superior e instrucciones inferiores
+PANEL_HEIGHT = 280
+FOOTER_HEIGHT = 40
 
 
 class EmotionDetector:
-    def __init__(self, game_name):
+    def __init__(self, game_name, clock=None):
         self.game_name = game_name
+        # Reloj de la sesión: tiempo real por defecto, tiempo del vídeo en modo replay
+        self.clock = clock or time.time
         self.face_cascade = cv2.CascadeClassifier(
             cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
         )
@@ -25,12 +42,11 @@ class EmotionDetector:
         }
         
         # Historial para análisis temporal
-        self.emotion_history = []
-        self.peak_rage_moments = []  # Momentos de mayor intensidad
-        self.happiness_streaks = []   # Rachas de felicidad
+        # Picos de rage y rachas de felicidad se calculan sobre este historial
+        self.emotion_history = EmotionHistory()
         
         # Tiempos mejorados
-        self.start_time = time.time()
+        self.start_time = self.clock()
         self.last_emotion = "neutral"
         self.emotion_threshold = 8  # Frames consecutivos (reducido para mayor sensibilidad)
         self.emotion_counter = 0
@@ -50,6 +66,10 @@ class EmotionDetector:
             'eye_min_neighbors': 8,
             'eye_min_size': (15, 15),
             
+            # Franjas de la cara donde se buscan sonrisa y ojos (fracción de la altura)
+            'smile_region_start': 0.5,
+            'eye_region_end': 0.6,
+            
             # Umbrales de intensidad (casi irrelevantes, se usa binario)
             'brow_angry_threshold': 90,      # Alto para no interferir
             'brow_very_angry_threshold': 78,
@@ -58,71 +78,100 @@ class EmotionDetector:
             # Velocidad de conteo
             'frames_between_counts': 14,  # Reacciona más rápido
             'emotion_confirmation_frames': 6,  # Cambia de emoción más rápido
+            
+            # Detección de caras
+            'face_scale_factor': 1.3,
+            'face_min_neighbors': 5,
+            'face_min_size': (100, 100),
+            'face_detect_width': 320,         # Ancho de la copia reducida (0 = resolución completa)
+            
+            # Seguimiento de la cara entre detecciones completas
+            'face_tracking': True,
+            'full_detect_interval': 15,       # Frames entre búsquedas en todo el frame
+            'tracking_padding': 0.5,          # Margen de la ventana (fracción de la cara)
+            'tracking_size_tolerance': 0.3,   # Variación de tamaño admitida
+            'tracking_max_drift': 0.5,        # Desplazamiento admitido (en anchos de cara) antes de buscar de nuevo
+            
+            # Captura en hilo separado
+            'capture_buffer_size': 1,     # Frames retenidos (se descartan los más antiguos)
+            'max_frame_age': 0.5,         # Segundos; frames más viejos no se analizan
         }
         
-        # Racha actual
-        self.current_streak = {"emotion": "neutral", "count": 0, "start_time": time.time()}
-        
-    def detect_emotion(self, frame, gray, face):
-        """Detecta la emoción basándose en características faciales - VERSIÓN BINARIA"""
-        x, y, w, h = face
-        roi_gray = gray[y:y + h, x:x + w]
-        roi_color = frame[y:y + h, x:x + w]
-        
-        # Detectar sonrisa con parámetros ajustados
-        smiles = self.smile_cascade.detectMultiScale(
-            roi_gray,
-            scaleFactor=self.config['smile_scale_factor'],
-            minNeighbors=self.config['smile_min_neighbors'],
-            minSize=self.config['smile_min_size']
-        )
-        
-        # Detectar ojos
-        eyes = self.eye_cascade.detectMultiScale(
-            roi_gray,
-            scaleFactor=self.config['eye_scale_factor'],
-            minNeighbors=self.config['eye_min_neighbors'],
-            minSize=self.config['eye_min_size']
+        self.face_tracker = FaceTracker(
+            self.face_cascade,
+            enabled=self.config['face_tracking'],
+            full_detect_interval=self.config['full_detect_interval'],
+            padding=self.config['tracking_padding'],
+            size_tolerance=self.config['tracking_size_tolerance'],
+            max_drift=self.config['tracking_max_drift'],
+            scale_factor=self.config['face_scale_factor'],
+            min_neighbors=self.config['face_min_neighbors'],
+            min_size=self.config['face_min_size'],
+            detect_width=self.config['face_detect_width']
         )
         
-        # Análisis de regiones faciales
-        brow_region = roi_gray[0:int(h*0.35), :]
-        brow_mean = brow_region.mean()
-        
-        mouth_region = roi_gray[int(h*0.6):, :]
-        mouth_mean = mouth_region.mean()
+        # Objetivo de rendimiento (sección "performance" de config.json)
+        self.performance = load_settings('performance', {
+            'target_verdict_hz': None,   # Veredictos por segundo (None = cada frame)
+            'cpu_budget': None,          # Fracción de un núcleo, p. ej. 0.15
+            'display_hz': 30,            # Refresco máximo de la ventana
+            'min_display_hz': 5,         # Refresco garantizado aunque se agote cpu_budget
+            'live_interval': 0.5,        # Segundos entre estados en vivo (0 = no publicar)
+        })
+        
+        # Opciones de visualización (sección "display" de config.json)
+        self.display_settings = load_settings('display', {
+            'show_confidence': True,
+            'show_debug_info': False,
+            'overlay_opacity': 0.7,
+        })
+        
+        # Compositor del overlay con capas de texto cacheadas
+        self.overlay = OverlayCompositor(opacity=self.display_settings['overlay_opacity'])
+        
+        # Temporizadores por etapa del bucle principal
+        self.metrics = PipelineMetrics()
+        
+        # Estado en vivo para el dashboard (solo durante run())
+        self.live = LivePublisher(interval=self.performance['live_interval'])
+        self.current_emotion = "neutral"
+        self.current_confidence = 0
+        
+        # Métricas de latencia de captura
+        self.dropped_frames = 0
+        self.stale_frames = 0
+        self.scheduled_detections = 0
+        self.skipped_detections = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
         
-        # Región de ojos para detectar tensión
-        eye_region = roi_gray[int(h*0.2):int(h*0.5), :]
-        eye_mean = eye_region.mean()
+    def detect_emotion(self, frame, gray, face):
+        """Detecta la emoción basándose en características faciales - VERSIÓN BINARIA
         
-        # Calcular varianza para detectar tensión muscular
-        brow_variance = np.var(brow_region)
+        Las características se evalúan bajo demanda: si hay sonrisa no se
+        llega a ejecutar el cascade de ojos.
+        """
+        x, y, w, h = face
+        features = FaceFeatures(
+            gray[y:y + h, x:x + w], self.smile_cascade, self.eye_cascade, self.config
+        )
         
         # ========================================
         # LÓGICA BINARIA ULTRA-SIMPLE PARA DEMO
         # ========================================
         
-        emotion = "angry"  # Estado por defecto = ENFADADO
-        confidence = 75    # Confianza alta por defecto
-        
         # ÚNICA FORMA DE ESTAR FELIZ: DETECTAR SONRISA (aunque sea leve)
+        smiles = features.smiles
         if len(smiles) > 0:
-            emotion = "happy"
-            confidence = 85 + min(len(smiles) * 5, 15)  # 85-100%
-        
-        # SIN SONRISA = ENFADADO (sin importar nada más)
-        else:
-            emotion = "angry"
-            confidence = 80  # Alta confianza en enfado
+            return "happy", 85 + min(len(smiles) * 5, 15)  # 85-100%
         
         # Neutral prácticamente no se usa (solo si el rostro está muy mal detectado)
         # Esto lo mantienes para decir "estamos trabajando en mejorarlo"
-        if len(eyes) < 2 and len(smiles) == 0:
-            emotion = "neutral"
-            confidence = 30  # Baja confianza
+        if len(features.eyes) < 2:
+            return "neutral", 30  # Baja confianza
         
-        return emotion, confidence
+        # SIN SONRISA = ENFADADO (sin importar nada más)
+        return "angry", 80  # Alta confianza en enfado
     
     def update_emotion_count(self, emotion, confidence):
         """
@@ -161,60 +210,50 @@ class EmotionDetector:
                 self.frame_count = 0
                 
                 # Registrar en historial temporal
-                current_time = time.time() - self.start_time
-                self.emotion_history.append({
-                    'timestamp': current_time,
-                    'emotion': emotion,
-                    'confidence': confidence
-                })
-                
-                # Detectar picos de rage
-                if emotion == "angry" and confidence > 70:
-                    self.peak_rage_moments.append(current_time)
-                
-                # Actualizar racha actual
-                self._update_streak(emotion)
-    
-    def _update_streak(self, emotion):
-        """Actualiza las rachas de emociones"""
-        if self.current_streak['emotion'] == emotion:
-            self.current_streak['count'] += 1
-        else:
-            # Guardar racha anterior si fue significativa
-            if self.current_streak['count'] >= 3:
-                if self.current_streak['emotion'] == "happy":
-                    duration = time.time() - self.current_streak['start_time']
-                    self.happiness_streaks.append({
-                        'count': self.current_streak['count'],
-                        'duration': duration
-                    })
-            
-            # Iniciar nueva racha
-            self.current_streak = {
-                'emotion': emotion,
-                'count': 1,
-                'start_time': time.time()
-            }
+                current_time = self.clock() - self.start_time
+                self.emotion_history.append(current_time, emotion, confidence)
     
     def draw_info(self, frame, emotion, confidence):
-        """Dibuja información en pantalla - VERSIÓN BINARIA"""
-        elapsed_time = int(time.time() - self.start_time)
+        """Dibuja información en pantalla - VERSIÓN BINARIA
+        
+        El texto se renderiza en capas cacheadas que solo se redibujan cuando
+        cambian los contadores, el estado o el segundo mostrado.
+        """
+        elapsed_time = int(self.clock() - self.start_time)
+        height, width = frame.shape[:2]
+        counts = self.emotion_counts
+        
+        # Fondo semi-transparente más grande (solo la región del panel)
+        self.overlay.blend_panel(frame)
+        
+        panel_key = (self.game_name, elapsed_time, emotion, confidence,
+                     counts['happy'], counts['angry'], counts['neutral'])
+        self.overlay.panel.update(
+            panel_key, (PANEL_HEIGHT, width),
+            lambda canvas: self._render_panel(canvas, emotion, confidence, elapsed_time)
+        )
+        self.overlay.panel.blit(frame, 0, 0)
+        
+        # Instrucciones
+        self.overlay.footer.update(width, (FOOTER_HEIGHT, width), self._render_footer)
+        self.overlay.footer.blit(frame, 0, height - FOOTER_HEIGHT)
+        
+        if self.display_settings['show_debug_info']:
+            self.draw_debug_info(frame)
+    
+    def _render_panel(self, canvas, emotion, confidence, elapsed_time):
+        """Dibuja el texto del panel (coordenadas del frame) sobre la capa"""
         minutes = elapsed_time // 60
         seconds = elapsed_time % 60
         
-        # Fondo semi-transparente más grande
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 10), (450, 270), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
-        
         # Título del juego con estilo
-        cv2.putText(frame, f"RAGE TRACKER", (20, 35),
+        cv2.putText(canvas, f"RAGE TRACKER", (20, 35),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-        cv2.putText(frame, f"Juego: {self.game_name}", (20, 60),
+        cv2.putText(canvas, f"Juego: {self.game_name}", (20, 60),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
         # Tiempo de sesión
-        cv2.putText(frame, f"Tiempo: {minutes:02d}:{seconds:02d}", (20, 90),
+        cv2.putText(canvas, f"Tiempo: {minutes:02d}:{seconds:02d}", (20, 90),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 255, 100), 2)
         
         # Emoción actual con color y confianza - ÉNFASIS EN BINARIO
@@ -226,17 +265,17 @@ class EmotionDetector:
             emoji = "ENFADADO"
         
         emotion_text = f"{emoji} ({confidence}%)"
-        cv2.putText(frame, f"Estado: {emotion_text}", (20, 120),
+        cv2.putText(canvas, f"Estado: {emotion_text}", (20, 120),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
         
         # Advertencia si neutral está muy alto
         total_emotions = sum(self.emotion_counts.values())
         if total_emotions > 0 and self.emotion_counts['neutral'] > total_emotions * 0.1:
-            cv2.putText(frame, "NOTA: Neutral = Enfadado en este modo", (20, 145),
+            cv2.putText(canvas, "NOTA: Neutral = Enfadado en este modo", (20, 145),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 165, 0), 1)
         
         # Contadores - ENFATIZAR EL SISTEMA BINARIO
-        cv2.putText(frame, "--- CONTADORES ---", (20, 170),
+        cv2.putText(canvas, "--- CONTADORES ---", (20, 170),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
         
         # Calcular total real (happy + angry, neutral casi ignorado)
@@ -244,24 +283,38 @@ class EmotionDetector:
         happy_pct = (self.emotion_counts['happy'] / real_total * 100) if real_total > 0 else 0
         angry_pct = (self.emotion_counts['angry'] / real_total * 100) if real_total > 0 else 0
         
-        cv2.putText(frame, f"Feliz:    {self.emotion_counts['happy']} ({happy_pct:.0f}%)", (20, 195),
+        cv2.putText(canvas, f"Feliz:    {self.emotion_counts['happy']} ({happy_pct:.0f}%)", (20, 195),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-        cv2.putText(frame, f"Enfadado: {self.emotion_counts['angry']} ({angry_pct:.0f}%)", (20, 220),
+        cv2.putText(canvas, f"Enfadado: {self.emotion_counts['angry']} ({angry_pct:.0f}%)", (20, 220),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
         
         # Neutral solo si tiene valores
         if self.emotion_counts['neutral'] > 0:
-            cv2.putText(frame, f"Neutral:  {self.emotion_counts['neutral']} (transicion)", (20, 245),
+            cv2.putText(canvas, f"Neutral:  {self.emotion_counts['neutral']} (transicion)", (20, 245),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 100, 100), 1)
-        
-        # Instrucciones
-        cv2.putText(frame, "Presiona 'q' para salir | 'r' para reiniciar", 
-                    (20, frame.shape[0] - 20),
+    
+    def _render_footer(self, canvas):
+        """Capa de instrucciones (se dibuja una sola vez por ancho de frame)"""
+        cv2.putText(canvas, "Presiona 'q' para salir | 'r' para reiniciar", 
+                    (20, FOOTER_HEIGHT - 20),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
     
+    def draw_debug_info(self, frame):
+        """Dibuja FPS y latencias p50/p95/p99 por etapa (show_debug_info)"""
+        lines = self.metrics.overlay_lines()
+        box_width = min(320, frame.shape[1])
+        
+        def render(canvas):
+            for i, line in enumerate(lines):
+                cv2.putText(canvas, line, (10, 18 + 20 * i),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.45, (200, 200, 200), 1)
+        
+        self.overlay.debug.update(tuple(lines), (10 + 20 * len(lines), box_width), render)
+        self.overlay.debug.blit(frame, frame.shape[1] - box_width - 10, 10)
+    
     def get_session_summary(self):
         """Genera un resumen detallado de la sesión"""
-        total_time = int(time.time() - self.start_time)
+        total_time = int(self.clock() - self.start_time)
         total_emotions = sum(self.emotion_counts.values())
         
         # Calcular porcentajes
@@ -271,11 +324,11 @@ class EmotionDetector:
         }
         
         # Calcular tendencia emocional (últimos 10 registros)
-        recent_emotions = [h['emotion'] for h in self.emotion_history[-10:]]
-        if recent_emotions:
-            trend = max(set(recent_emotions), key=recent_emotions.count)
-        else:
-            trend = "neutral"
+        trend = self.emotion_history.trend(10)
+        
+        # Picos de rage (enfado con confianza alta) y rachas de felicidad
+        peak_rage_count = self.emotion_history.count("angry", min_confidence=70)
+        happiness_streaks = self.emotion_history.streaks("happy", min_count=3)
         
         return {
             "game": self.game_name,
@@ -287,15 +340,74 @@ class EmotionDetector:
             "happy_percentage": round(percentages["happy"], 2),
             "angry_percentage": round(percentages["angry"], 2),
             "neutral_percentage": round(percentages["neutral"], 2),
-            "peak_rage_count": len(self.peak_rage_moments),
-            "happiness_streaks": len(self.happiness_streaks),
+            "peak_rage_count": peak_rage_count,
+            "happiness_streaks": len(happiness_streaks),
             "emotional_trend": trend,
-            "total_frames": self.total_frames
+            "total_frames": self.total_frames,
+            # Historial completo; DataManager lo guarda como timeline de la sesión
+            "timeline": self.emotion_history
+        }
+    
+    def live_snapshot(self):
+        """Estado de la sesión en curso para el dashboard (contadores y emoción actual)"""
+        total_emotions = sum(self.emotion_counts.values())
+        rage_index = self.emotion_counts["angry"] / total_emotions * 100 if total_emotions else 0
+        return {
+            "game": self.game_name,
+            "elapsed_seconds": int(self.clock() - self.start_time),
+            "counts": dict(self.emotion_counts),
+            "current_emotion": self.current_emotion,
+            "confidence": self.current_confidence,
+            "rage_index": round(rage_index, 1),
+            "total_frames": self.total_frames,
+            "fps": self.metrics.snapshot()['fps'],
         }
     
-    def run(self):
-        """Ejecuta el detector de emociones"""
-        cap = cv2.VideoCapture(0)
+    def get_performance_report(self):
+        """Métricas de rendimiento de la sesión (se guardan junto a la sesión)"""
+        report = dict(self.metrics.snapshot(force=True))
+        report.update({
+            'dropped_frames': self.dropped_frames,
+            'stale_frames': self.stale_frames,
+            'max_latency_ms': round(self.max_latency * 1000, 1),
+            'detections': self.scheduled_detections,
+            'skipped_detections': self.skipped_detections,
+        })
+        return report
+    
+    def process_frame(self, frame):
+        """Analiza un frame completo: detección de cara, emoción y conteo.
+        
+        Returns:
+            tuple: (emoción, confianza, cara) donde cara es None si no se detectó
+        """
+        self.total_frames += 1
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        # Detectar caras (búsqueda completa o seguimiento en ventana)
+        faces = self.face_tracker.detect(gray)
+        
+        if len(faces) == 0:
+            return "neutral", 0, None
+        
+        # Usar solo la primera cara
+        face = faces[0]
+        emotion, confidence = self.detect_emotion(frame, gray, face)
+        self.update_emotion_count(emotion, confidence)
+        return emotion, confidence, face
+    
+    def reset_counts(self):
+        """Reinicia contadores e historial de la sesión"""
+        self.emotion_counts = {"neutral": 0, "happy": 0, "angry": 0}
+        self.emotion_history.clear()
+    
+    def run(self, source=None):
+        """Ejecuta el detector de emociones
+        
+        Args:
+            source: fuente de frames (ver src.frame_source); por defecto la webcam
+        """
+        cap = source if source is not None else CameraSource(0)
         
         if not cap.isOpened():
             print("Error: No se pudo abrir la cámara")
@@ -306,56 +418,118 @@ class EmotionDetector:
         print("Presiona 'r' para reiniciar contadores\n")
         
         confidence = 0
+        current_emotion = "neutral"
+        last_face = None
+        
+        scheduler = AdaptiveScheduler(
+            target_hz=self.performance['target_verdict_hz'],
+            cpu_budget=self.performance['cpu_budget'],
+            display_hz=self.performance['display_hz'],
+            min_display_hz=self.performance['min_display_hz'],
+            metrics=self.metrics
+        )
+        
+        # La captura corre en su propio hilo; aquí solo se consume el último frame.
+        # Una fuente finita (vídeo, imágenes) se lee al ritmo del análisis, sin
+        # descartar frames: si no, se leería entera antes de analizar ninguno
+        finite = cap.frame_count() is not None
+        grabber = FrameGrabber(cap, capacity=self.config['capture_buffer_size'], blocking=finite)
+        grabber.start()
         
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            self.total_frames += 1
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            wait_start = time.perf_counter()
+            captured = grabber.read(timeout=1.0)
+            if captured is None:
+                if grabber.finished:
+                    break
+                continue
+            self.metrics.record('capture_wait', time.perf_counter() - wait_start)
             
-            # Detectar caras
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.3,
-                minNeighbors=5,
-                minSize=(100, 100)
-            )
+            frame = captured.image
             
-            current_emotion = "neutral"
+            # Descartar frames demasiado viejos para mantener acotada la latencia
+            # (solo en vivo: de una fuente finita se analizan todos). El frame
+            # no se analiza ni se muestra, pero el teclado se sigue atendiendo
+            frame_age = time.perf_counter() - captured.captured_at
+            stale = not finite and frame_age > self.config['max_frame_age']
+            if stale:
+                self.stale_frames += 1
             
-            if len(faces) > 0:
-                # Usar solo la primera cara
-                face = faces[0]
-                x, y, w, h = face
+            # El planificador decide si este frame se analiza o solo se muestra
+            now = time.perf_counter()
+            detect = not stale and scheduler.should_detect(now)
+            if detect:
+                current_emotion, new_confidence, face = self.process_frame(frame)
+                detect_time = time.perf_counter() - now
+                scheduler.record('detect', detect_time)
+                self.metrics.record('detect', detect_time)
                 
-                # Dibujar rectángulo de cara
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+                if face is not None:
+                    confidence = new_confidence
+                last_face = face
+                self.current_emotion = current_emotion
+                self.current_confidence = confidence
                 
-                # Detectar emoción
-                current_emotion, confidence = self.detect_emotion(frame, gray, face)
-                self.update_emotion_count(current_emotion, confidence)
+                # Latencia desde la captura hasta el veredicto
+                self.last_latency = time.perf_counter() - captured.captured_at
+                self.max_latency = max(self.max_latency, self.last_latency)
             
-            # Dibujar información
-            self.draw_info(frame, current_emotion, confidence)
+            if detect or (not stale and scheduler.should_display(now)):
+                display_start = time.perf_counter()
+                if last_face is not None:
+                    x, y, w, h = last_face
+                    
+                    # Dibujar rectángulo de cara
+                    cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+                
+                # Dibujar información
+                self.draw_info(frame, current_emotion, confidence)
+                imshow_start = time.perf_counter()
+                self.metrics.record('overlay', imshow_start - display_start)
+                
+                # Mostrar frame
+                cv2.imshow("Rage Tracker - Emotion Detection", frame)
+                display_end = time.perf_counter()
+                self.metrics.record('display', display_end - imshow_start)
+                self.metrics.frame_done(display_end)
+                scheduler.mark_displayed(display_start)
+                scheduler.record('display', display_end - display_start)
             
-            # Mostrar frame
-            cv2.imshow("Rage Tracker - Emotion Detection", frame)
+            # Estado en vivo para el dashboard (como mucho cada live_interval segundos)
+            self.live.publish(self.live_snapshot, now)
             
-            # Controles de teclado
-            key = cv2.waitKey(1) & 0xFF
+            # Controles de teclado (la espera deja CPU libre para el juego)
+            wait_ms = max(1, int(scheduler.sleep_time() * 1000))
+            key = cv2.waitKey(wait_ms) & 0xFF
             if key == ord('q'):
                 break
             elif key == ord('r'):
                 # Reiniciar contadores
-                self.emotion_counts = {"neutral": 0, "happy": 0, "angry": 0}
-                self.emotion_history = []
-                self.peak_rage_moments = []
-                self.happiness_streaks = []
+                self.reset_counts()
                 print("✅ Contadores reiniciados")
         
+        grabber.stop()
+        self.dropped_frames = grabber.dropped
+        self.scheduled_detections = scheduler.detections
+        self.skipped_detections = scheduler.skipped
+        
         cap.release()
         cv2.destroyAllWindows()
-        
-        return self.get_session_summary()
\ No newline at end of file
+        self.live.finish(self.live_snapshot())
+        
+        if self.dropped_frames or self.stale_frames:
+            print(f"📉 Frames descartados: {self.dropped_frames} (sin procesar), "
+                  f"{self.stale_frames} (demasiado viejos) | "
+                  f"Latencia máx.: {self.max_latency * 1000:.0f} ms")
+        
+        performance = self.get_performance_report()
+        print(f"⏱️  Rendimiento: {performance['fps']:.1f} FPS | "
+              f"detección p95 {performance['stages']['detect']['p95_ms']:.0f} ms")
+        throttled = performance['counters'].get('display_throttled', 0)
+        if throttled:
+            print(f"⚠️  cpu_budget limitó el refresco de la ventana ({throttled} refrescos omitidos; "
+                  f"mínimo garantizado {self.performance['min_display_hz']} Hz)")
+        
+        session_data = self.get_session_summary()
+        session_data['performance'] = performance
+        return session_data
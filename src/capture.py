@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+
+# Frame capturado junto con su número de secuencia y el instante de captura
+CapturedFrame = namedtuple("CapturedFrame", ["frame_id", "image", "captured_at"])
+
+
+class LatestFrameSlot:
+    """Buffer acotado que conserva solo los frames más recientes (descarta los más antiguos).
+
+    Con `blocking=True` no descarta nada: put() espera a que haya sitio.
+    Es el modo para fuentes finitas (vídeo, imágenes), que se leen tan
+    rápido como se decodifican y en las que cada frame cuenta.
+    """
+
+    def __init__(self, capacity=1, blocking=False):
+        self.capacity = max(1, int(capacity))
+        self.blocking = blocking
+        self._frames = deque(maxlen=self.capacity)
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, item):
+        """Añade un frame; si el buffer está lleno se pierde el más antiguo (o se espera)"""
+        with self._cond:
+            if self.blocking:
+                self._cond.wait_for(lambda: len(self._frames) < self.capacity or self.closed)
+                if self.closed:
+                    return
+            elif len(self._frames) == self.capacity:
+                self.dropped += 1
+            self._frames.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Devuelve el siguiente frame o None si no llega ninguno a tiempo"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._frames or self.closed, timeout)
+            if not self._frames:
+                return None
+            item = self._frames.popleft()
+            # Despierta a un productor que espere sitio (modo bloqueante)
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Marca el buffer como cerrado y despierta a los consumidores"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FrameGrabber(threading.Thread):
+    """Hilo de captura que lee frames sin esperar a la detección.
+
+    La captura nunca se bloquea por una pasada lenta de los cascades: si el
+    consumidor va atrasado, los frames viejos se descartan en el slot y la
+    detección siempre trabaja sobre la imagen más reciente. Con
+    `blocking=True` (fuentes finitas) la lectura espera al consumidor en
+    lugar de descartar.
+    """
+
+    def __init__(self, cap, capacity=1, blocking=False):
+        super().__init__(name="FrameGrabber", daemon=True)
+        self.cap = cap
+        self.slot = LatestFrameSlot(capacity, blocking)
+        self.frames_captured = 0
+        self.finished = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.frames_captured += 1
+                self.slot.put(CapturedFrame(self.frames_captured, frame, time.perf_counter()))
+        finally:
+            self.finished = True
+            self.slot.close()
+
+    def read(self, timeout=None):
+        """Obtiene el frame más reciente disponible (CapturedFrame o None)"""
+        return self.slot.get(timeout)
+
+    @property
+    def dropped(self):
+        """Frames capturados que nunca llegaron a procesarse"""
+        return self.slot.dropped
+
+    def stop(self, timeout=2.0):
+        """Detiene el hilo de captura y espera a que termine"""
+        self._stop_event.set()
+        # Despierta al hilo si está esperando sitio en el slot
+        self.slot.close()
+        if self.is_alive():
+            self.join(timeout)
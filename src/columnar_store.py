@@ -0,0 +1,305 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from src.emotion_history import EMOTION_CODES
+from src.games_registry import game_key
+from src.storage import empty_game_stats
+
+
+# Una columna por campo de sessions.csv; el juego y la tendencia van codificados
+COLUMNS = {
+    'game': np.int32,
+    'timestamp': np.int64,          # segundos desde 1970 de la fecha (hora local tal cual)
+    'duration_seconds': np.int64,
+    'happy_count': np.int64,
+    'angry_count': np.int64,
+    'neutral_count': np.int64,
+    'happy_percentage': np.float64,
+    'angry_percentage': np.float64,
+    'neutral_percentage': np.float64,
+    'peak_rage_count': np.int64,
+    'happiness_streaks': np.int64,
+    'emotional_trend': np.uint8,
+    'total_frames': np.int64,
+}
+
+SECONDS_PER_DAY = 86400
+
+
+def _fingerprint(row):
+    """Huella de una fila para comprobar que el origen no se ha reescrito"""
+    return [str(row.get('game', '')), str(row.get('date', '')), str(row.get('duration_seconds', ''))]
+
+
+def _numbers(rows, column, dtype):
+    values = np.empty(len(rows), dtype=dtype)
+    for i, row in enumerate(rows):
+        try:
+            values[i] = float(row.get(column) or 0)
+        except (TypeError, ValueError):
+            values[i] = 0
+    return values
+
+
+def _timestamps(rows):
+    dates = [str(row.get('date') or '') for row in rows]
+    try:
+        parsed = np.array(dates, dtype='datetime64[s]')
+    except ValueError:
+        # Alguna fecha no es válida: se convierten una a una (-1 = sin fecha)
+        parsed = np.empty(len(dates), dtype='datetime64[s]')
+        for i, value in enumerate(dates):
+            try:
+                parsed[i] = np.datetime64(value, 's')
+            except ValueError:
+                parsed[i] = np.datetime64('NaT')
+    values = parsed.astype(np.int64)
+    values[np.isnat(parsed)] = -1
+    return values
+
+
+class ColumnarStore:
+    """Copia por columnas de la tabla de sesiones para analítica masiva.
+
+    Cada columna es un archivo binario de tipo fijo en data/columns/ que se
+    lee con memmap; los nombres de juego se guardan como códigos enteros
+    con su diccionario en meta.json, junto con el backend de origen y su
+    sello. `sync` añade solo las sesiones nuevas del backend (o reconstruye
+    todo si el origen cambió o se reescribió), y las
+    agregaciones se hacen con operaciones vectorizadas de NumPy sobre
+    columnas completas, sin recorrer filas en Python.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.meta_file = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        self._meta = None
+        self._columns = None
+        self._game_codes = {}
+
+    def _column_file(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    @staticmethod
+    def _empty_meta():
+        return {'rows': 0, 'last': None, 'games': [], 'backend': None, 'stamp': None}
+
+    def _load_meta(self):
+        if self._meta is not None:
+            return
+        self._meta = self._empty_meta()
+        if os.path.exists(self.meta_file):
+            try:
+                with open(self.meta_file, 'r', encoding='utf-8') as f:
+                    self._meta.update(json.load(f))
+            except (OSError, ValueError):
+                self._meta['rows'] = None
+        self._game_codes = {game_key(name): code for code, name in enumerate(self._meta['games'])}
+
+    def _save_meta(self):
+        tmp_path = self.meta_file + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f)
+        os.replace(tmp_path, self.meta_file)
+
+    def _encode_games(self, rows):
+        codes = np.empty(len(rows), dtype=np.int32)
+        for i, row in enumerate(rows):
+            name = str(row.get('game', ''))
+            code = self._game_codes.get(game_key(name))
+            if code is None:
+                code = self._game_codes[game_key(name)] = len(self._meta['games'])
+                self._meta['games'].append(name)
+            codes[i] = code
+        return codes
+
+    def _append(self, rows, files=None):
+        if not rows:
+            return
+        arrays = {
+            'game': self._encode_games(rows),
+            'timestamp': _timestamps(rows),
+            'emotional_trend': np.array(
+                [EMOTION_CODES.get(row.get('emotional_trend'), 0) for row in rows], dtype=np.uint8
+            ),
+        }
+        for name, dtype in COLUMNS.items():
+            values = arrays[name] if name in arrays else _numbers(rows, name, dtype)
+            path = files[name] if files else self._column_file(name)
+            with open(path, 'ab') as f:
+                values.astype(dtype).tofile(f)
+        self._meta['rows'] += len(rows)
+        self._meta['last'] = _fingerprint(rows[-1])
+        self._columns = None
+
+    def _rebuild(self, backend):
+        # Se sueltan los memmap antes de sustituir sus archivos (en Windows
+        # no se puede reemplazar un archivo mapeado)
+        self._columns = None
+        tmp_files = {name: f"{self._column_file(name)}.{os.getpid()}.tmp" for name in COLUMNS}
+        for path in tmp_files.values():
+            open(path, 'wb').close()
+        self._meta = self._empty_meta()
+        self._game_codes = {}
+        self._append(backend.read_sessions(0), tmp_files)
+        # Cada columna se cambia de una vez: un lector ve la antigua o la nueva
+        for name, path in tmp_files.items():
+            os.replace(path, self._column_file(name))
+
+    def sync(self, backend):
+        """Pone la copia al día con las sesiones del backend"""
+        with self._lock:
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory)
+            self._load_meta()
+            # El sello se toma antes de leer: lo que se escriba después se verá
+            # en la próxima llamada
+            source = [backend.name, backend.source]
+            stamp = backend.stamp()
+            rows = self._meta['rows']
+            if rows is not None and self._meta['backend'] == source and self._meta['stamp'] == stamp:
+                return self
+
+            if not rows or self._meta['backend'] != source:
+                self._rebuild(backend)
+            else:
+                # Se relee la última fila copiada para detectar reescrituras
+                tail = backend.read_sessions(rows - 1)
+                if not tail or _fingerprint(tail[0]) != self._meta['last']:
+                    self._rebuild(backend)
+                elif len(tail) > 1:
+                    self._append(tail[1:])
+            self._meta['backend'] = source
+            self._meta['stamp'] = stamp
+            self._save_meta()
+        return self
+
+    def columns(self):
+        """Columnas como arrays memmap de solo lectura"""
+        with self._lock:
+            self._load_meta()
+            if self._columns is None:
+                rows = self._meta['rows'] or 0
+                self._columns = {
+                    name: (np.memmap(self._column_file(name), dtype=dtype, mode='r', shape=(rows,))
+                           if rows else np.empty(0, dtype=dtype))
+                    for name, dtype in COLUMNS.items()
+                }
+            return self._columns
+
+    def __len__(self):
+        return len(self.columns()['game'])
+
+    @property
+    def game_names(self):
+        self._load_meta()
+        return list(self._meta['games'])
+
+    def _window(self, date_from=None, date_to=None, game_name=None):
+        """Máscara booleana de filas dentro de la ventana (None = todas)"""
+        columns = self.columns()
+        mask = None
+        if date_from is not None:
+            lower = np.datetime64(str(date_from)[:10], 's').astype(np.int64)
+            mask = columns['timestamp'] >= lower
+        if date_to is not None:
+            upper = (np.datetime64(str(date_to)[:10], 'D') + 1).astype('datetime64[s]').astype(np.int64)
+            hits = columns['timestamp'] < upper
+            mask = hits if mask is None else mask & hits
+        if game_name is not None:
+            code = self._game_codes.get(game_key(game_name), -1)
+            hits = columns['game'] == code
+            mask = hits if mask is None else mask & hits
+        return mask
+
+    def totals(self, date_from=None, date_to=None, game_name=None):
+        """Sumas y medias globales con el formato de get_game_stats"""
+        groups = self._grouped(np.zeros(len(self), dtype=np.int64), 1,
+                               self._window(date_from, date_to, game_name))
+        return groups[0]
+
+    def _grouped(self, codes, size, mask):
+        """Estadísticas por código de grupo con np.bincount"""
+        columns = self.columns()
+        if mask is not None:
+            codes = codes[mask]
+
+        def total(name):
+            values = columns[name] if mask is None else columns[name][mask]
+            return np.bincount(codes, weights=values, minlength=size)
+
+        sessions = np.bincount(codes, minlength=size)
+        sums = {
+            'total_time': total('duration_seconds'),
+            'total_happy': total('happy_count'),
+            'total_angry': total('angry_count'),
+            'total_neutral': total('neutral_count'),
+            'avg_rage_percentage': total('angry_percentage'),
+            'avg_happy_percentage': total('happy_percentage'),
+            'total_peak_rages': total('peak_rage_count'),
+            'total_happy_streaks': total('happiness_streaks'),
+        }
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name in ('avg_rage_percentage', 'avg_happy_percentage'):
+                sums[name] = np.where(sessions > 0, sums[name] / np.maximum(sessions, 1), 0.0)
+
+        groups = []
+        for i in range(size):
+            stats = empty_game_stats()
+            stats['total_sessions'] = int(sessions[i])
+            for name, values in sums.items():
+                stats[name] = float(values[i]) if name.startswith('avg') else int(values[i])
+            groups.append(stats)
+        return groups
+
+    def group_by(self, key='game', date_from=None, date_to=None, game_name=None, names=None):
+        """Estadísticas por juego o por día (YYYY-MM-DD) en una sola pasada vectorizada.
+
+        Por juego, `names` (clave normalizada -> nombre) da el nombre con el
+        que se etiqueta cada grupo, p. ej. el registrado en la lista de
+        juegos; sin él se usa el de la primera sesión.
+        """
+        columns = self.columns()
+        mask = self._window(date_from, date_to, game_name)
+
+        if key == 'game':
+            labels = self.game_names
+            if names:
+                labels = [names.get(game_key(label), label) for label in labels]
+            groups = self._grouped(columns['game'].astype(np.int64), len(labels), mask)
+            return {label: stats for label, stats in zip(labels, groups) if stats['total_sessions']}
+
+        if key == 'day':
+            days = columns['timestamp'] // SECONDS_PER_DAY
+            valid = columns['timestamp'] >= 0
+            mask = valid if mask is None else mask & valid
+            unique_days, codes = np.unique(days[mask], return_inverse=True)
+            # _grouped aplica la máscara a los códigos: se expanden a todas las filas
+            all_codes = np.zeros(len(days), dtype=np.int64)
+            all_codes[mask] = codes
+            groups = self._grouped(all_codes, len(unique_days), mask)
+            labels = unique_days.astype('datetime64[D]').astype(str)
+            return dict(zip(labels, groups))
+
+        raise ValueError(f"Agrupación no soportada: {key}")
+
+    def percentiles(self, column, ps=(50, 90, 99), date_from=None, date_to=None, game_name=None):
+        """Percentiles de una columna numérica dentro de la ventana"""
+        values = self.columns()[column]
+        mask = self._window(date_from, date_to, game_name)
+        if mask is not None:
+            values = values[mask]
+        if len(values) == 0:
+            return {p: 0.0 for p in ps}
+        return dict(zip(ps, np.percentile(values, ps).tolist()))
+
+    def mean(self, column, date_from=None, date_to=None, game_name=None):
+        values = self.columns()[column]
+        mask = self._window(date_from, date_to, game_name)
+        if mask is not None:
+            values = values[mask]
+        return float(values.mean()) if len(values) else 0.0
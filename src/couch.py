@@ -0,0 +1,205 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from src.camera import EmotionDetector
+from src.capture import FrameGrabber
+from src.face_tracker import FaceTracker
+from src.frame_source import CameraSource
+
+
+# Colores de las cajas de cada jugador (BGR)
+PLAYER_COLORS = [(255, 0, 0), (0, 200, 255), (255, 0, 255), (0, 255, 255)]
+
+# Frames en los que debe aparecer un jugador para guardar su sesión
+# (descarta falsos positivos de uno o pocos frames)
+MIN_PLAYER_FRAMES = 30
+
+
+class Player:
+    """Estado de un jugador: su propio detector, caja y contadores"""
+
+    def __init__(self, number, game_name, face, clock=None):
+        self.number = number
+        self.name = f"Jugador {number}"
+        # Cada jugador tiene sus propios cascades: así los hilos nunca comparten uno
+        self.detector = EmotionDetector(game_name, clock=clock)
+        self.face = face
+        self.emotion = "neutral"
+        self.confidence = 0
+        # Frames analizados (no se reinicia con 'r', a diferencia de los contadores)
+        self.frames_seen = 0
+
+    def center(self):
+        x, y, w, h = self.face
+        return x + w / 2, y + h / 2
+
+    def analyze(self, frame, gray, face):
+        """Detecta y cuenta la emoción de este jugador (se ejecuta en el pool)"""
+        self.face = face
+        self.emotion, self.confidence = self.detector.detect_emotion(frame, gray, face)
+        self.detector.update_emotion_count(self.emotion, self.confidence)
+        self.detector.total_frames += 1
+        self.frames_seen += 1
+        return self.emotion, self.confidence
+
+    def has_data(self, min_frames):
+        """True si el jugador apareció lo bastante y su detector contó algo"""
+        return self.frames_seen >= min_frames and sum(self.detector.emotion_counts.values()) > 0
+
+
+class CouchSession:
+    """Modo sofá: varios jugadores en el mismo frame.
+
+    Cada cara se asigna al jugador más cercano del frame anterior, y el
+    análisis de todas las caras de un frame se reparte en un pool de hilos
+    (OpenCV libera el GIL dentro de detectMultiScale), así la latencia por
+    frame no crece con el número de jugadores.
+    """
+
+    def __init__(self, game_name, max_players=4, clock=None, min_player_frames=MIN_PLAYER_FRAMES):
+        self.game_name = game_name
+        self.max_players = max_players
+        self.min_player_frames = min_player_frames
+        self.clock = clock or time.time
+        self.start_time = self.clock()
+        self.players = []
+        self.total_frames = 0
+
+        # Detección completa en cada frame (varias caras), sobre imagen reducida
+        self.face_detector = EmotionDetector(game_name, clock=self.clock)
+        config = self.face_detector.config
+        self.face_tracker = FaceTracker(
+            self.face_detector.face_cascade,
+            enabled=False,
+            scale_factor=config['face_scale_factor'],
+            min_neighbors=config['face_min_neighbors'],
+            min_size=config['face_min_size'],
+            detect_width=config['face_detect_width']
+        )
+        self.pool = ThreadPoolExecutor(max_workers=max_players, thread_name_prefix="couch")
+
+    def _assign(self, faces):
+        """Empareja cada cara con un jugador (el más cercano) o crea uno nuevo.
+
+        Mientras queden plazas, una cara a más de un ancho de cara de todos
+        los jugadores es un jugador nuevo; con todas ocupadas, cada cara va
+        al jugador libre más cercano, esté a la distancia que esté.
+        """
+        pairs = []
+        free = list(self.players)
+        for face in sorted(faces, key=lambda f: f[2] * f[3], reverse=True)[:self.max_players]:
+            x, y, w, h = face
+            cx, cy = x + w / 2, y + h / 2
+            full = len(self.players) >= self.max_players
+            best, best_dist = None, float('inf') if full else max(w, h) ** 2
+            for player in free:
+                px, py = player.center()
+                dist = (px - cx) ** 2 + (py - cy) ** 2
+                if dist < best_dist:
+                    best, best_dist = player, dist
+            if best is None and len(self.players) < self.max_players:
+                best = Player(len(self.players) + 1, self.game_name, face, clock=self.clock)
+                best.detector.start_time = self.start_time
+                self.players.append(best)
+            elif best is not None:
+                free.remove(best)
+            if best is not None:
+                pairs.append((best, face))
+        return pairs
+
+    def process_frame(self, frame):
+        """Analiza todas las caras del frame en paralelo.
+
+        Returns:
+            list: pares (jugador, cara) analizados en este frame
+        """
+        self.total_frames += 1
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        pairs = self._assign(self.face_tracker.detect(gray))
+
+        futures = [self.pool.submit(player.analyze, frame, gray, face) for player, face in pairs]
+        for future in futures:
+            future.result()
+        return pairs
+
+    def draw_info(self, frame, pairs):
+        """Dibuja la caja y el estado de cada jugador"""
+        elapsed_time = int(self.clock() - self.start_time)
+        cv2.putText(frame, f"RAGE TRACKER - Modo sofa | {elapsed_time // 60:02d}:{elapsed_time % 60:02d}",
+                    (20, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+
+        for player, (x, y, w, h) in pairs:
+            color = PLAYER_COLORS[(player.number - 1) % len(PLAYER_COLORS)]
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+            state = "FELIZ" if player.emotion == "happy" else "ENFADADO"
+            counts = player.detector.emotion_counts
+            cv2.putText(frame, f"J{player.number}: {state} ({player.confidence}%)",
+                        (x, max(20, y - 30)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+            cv2.putText(frame, f"Feliz {counts['happy']} | Enfadado {counts['angry']}",
+                        (x, max(40, y - 10)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+
+        cv2.putText(frame, "Presiona 'q' para salir | 'r' para reiniciar",
+                    (20, frame.shape[0] - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+
+    def get_session_summaries(self):
+        """Resumen de sesión de cada jugador (con la clave extra 'player').
+
+        Se omiten los jugadores vistos en menos de `min_player_frames` frames
+        o sin ninguna emoción contada (falsos positivos, caras perdidas).
+        """
+        summaries = []
+        for player in self.players:
+            if not player.has_data(self.min_player_frames):
+                continue
+            summary = player.detector.get_session_summary()
+            summary['player'] = player.name
+            summaries.append(summary)
+        return summaries
+
+    def run(self, source=None):
+        """Ejecuta el modo sofá y devuelve la lista de resúmenes por jugador"""
+        cap = source if source is not None else CameraSource(0)
+
+        if not cap.isOpened():
+            print("Error: No se pudo abrir la cámara")
+            return None
+
+        print(f"\n🛋️  Modo sofá iniciado para: {self.game_name} (hasta {self.max_players} jugadores)")
+        print("Presiona 'q' para finalizar la sesión")
+        print("Presiona 'r' para reiniciar contadores\n")
+
+        # Fuentes finitas: sin descartar frames (ver EmotionDetector.run)
+        grabber = FrameGrabber(cap, capacity=self.face_detector.config['capture_buffer_size'],
+                               blocking=cap.frame_count() is not None)
+        grabber.start()
+
+        try:
+            while True:
+                captured = grabber.read(timeout=1.0)
+                if captured is None:
+                    if grabber.finished:
+                        break
+                    continue
+
+                frame = captured.image
+                pairs = self.process_frame(frame)
+                self.draw_info(frame, pairs)
+                cv2.imshow("Rage Tracker - Couch Mode", frame)
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                elif key == ord('r'):
+                    for player in self.players:
+                        player.detector.reset_counts()
+                    print("✅ Contadores reiniciados")
+        finally:
+            grabber.stop()
+            cap.release()
+            cv2.destroyAllWindows()
+            self.pool.shutdown()
+
+        return self.get_session_summaries()
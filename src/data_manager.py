@@ -1,143 +1,177 @@
-import csv
+import json
 import os
 from datetime import datetime
 
+from src.columnar_store import ColumnarStore
+from src.settings import load_settings
+from src.stats_cache import GameStatsCache, accumulate, finalize_stats
+from src.storage import game_key, open_backend
+from src.timeline_store import TimelineStore
+
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.data_dir = "data"
         self.games_file = os.path.join(self.data_dir, "games.csv")
         self.sessions_file = os.path.join(self.data_dir, "sessions.csv")
-        self._initialize_files()
-    
-    def _initialize_files(self):
-        """Crea el directorio data y los archivos CSV si no existen"""
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
-        
-        # Inicializar games.csv
-        if not os.path.exists(self.games_file):
-            with open(self.games_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['game_name', 'date_added', 'genre', 'notes'])
+        self.metrics_dir = os.path.join(self.data_dir, "metrics")
+        self.timelines = TimelineStore(os.path.join(self.data_dir, "timelines"))
         
-        # Inicializar sessions.csv con CAMPOS MEJORADOS
-        if not os.path.exists(self.sessions_file):
-            with open(self.sessions_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'game', 'date', 'duration_seconds', 
-                    'happy_count', 'angry_count', 'neutral_count',
-                    'happy_percentage', 'angry_percentage', 'neutral_percentage',
-                    'peak_rage_count', 'happiness_streaks', 'emotional_trend',
-                    'total_frames'
-                ])
+        # Backend de juegos y sesiones: CSV por defecto o SQLite (config.json)
+        if backend is None:
+            settings = load_settings('storage', {'backend': 'csv', 'database': None})
+            backend = open_backend(settings, self.data_dir)
+        self.backend = backend
+        self.columnar = ColumnarStore(os.path.join(self.data_dir, "columns"))
+        self.stats_cache = GameStatsCache(backend, os.path.join(self.data_dir, "stats_cache.json"))
     
     def add_game(self, game_name, genre="", notes=""):
         """Añade un nuevo juego a la lista"""
-        # Verificar si ya existe
-        if self.game_exists(game_name):
-            return False
-        
-        with open(self.games_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([game_name, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), genre, notes])
-        return True
+        return self.backend.add_game(game_name, genre, notes)
     
     def game_exists(self, game_name):
         """Verifica si un juego ya existe"""
-        games = self.get_games()
-        return game_name.lower() in [g.lower() for g in games]
+        return self.backend.game_exists(game_name)
     
     def get_games(self):
         """Obtiene la lista de juegos como STRINGS SIMPLES (compatible con menu.py antiguo)"""
-        games = []
-        if os.path.exists(self.games_file):
-            try:
-                with open(self.games_file, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        # Devolver solo el nombre del juego como string
-                        games.append(row.get('game_name', ''))
-            except (KeyError, csv.Error):
-                print("⚠️  Archivo games.csv corrupto, reiniciando...")
-                with open(self.games_file, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(['game_name', 'date_added', 'genre', 'notes'])
-        return games
+        return self.backend.get_games()
+    
+    def get_game_records(self):
+        """Juegos con todos sus campos (nombre, fecha, género, notas)"""
+        return self.backend.get_game_records()
+    
+    def get_game_record(self, game_name):
+        """Registro de un juego (sin distinguir mayúsculas) o None si no existe"""
+        return self.backend.get_game_record(game_name)
+    
+    def count_sessions(self):
+        """Número de sesiones guardadas"""
+        return self.backend.count_sessions()
+    
+    def get_sessions_page(self, limit, before=None, game_name=None, date_from=None, date_to=None):
+        """Página de sesiones (id, fila), de la más reciente a la más antigua.
+        
+        Args:
+            limit (int): sesiones como máximo
+            before (int): solo sesiones con id menor (None = desde la última)
+            game_name (str): limitar a un juego (sin distinguir mayúsculas)
+            date_from, date_to: días incluidos ("YYYY-MM-DD"), opcionales
+        """
+        return self.backend.page_sessions(limit, before, game_name, date_from, date_to)
     
     def save_session(self, session_data):
-        """Guarda los datos de una sesión con DATOS MEJORADOS"""
-        with open(self.sessions_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                session_data['game'],
-                session_data['date'],
-                session_data['duration_seconds'],
-                session_data['happy_count'],
-                session_data['angry_count'],
-                session_data['neutral_count'],
-                session_data.get('happy_percentage', 0),
-                session_data.get('angry_percentage', 0),
-                session_data.get('neutral_percentage', 0),
-                session_data.get('peak_rage_count', 0),
-                session_data.get('happiness_streaks', 0),
-                session_data.get('emotional_trend', 'neutral'),
-                session_data.get('total_frames', 0)
-            ])
+        """Guarda los datos de una sesión con DATOS MEJORADOS
+        
+        Si la sesión trae métricas de rendimiento ('performance'), se guardan
+        en data/metrics/session_<id>.json; su historial ('timeline') va al
+        almacén binario de data/timelines.
+        
+        Returns:
+            int: id de la sesión (su posición en sessions.csv, empezando en 0)
+        """
+        # Con el bloqueo de los agregados, ningún otro proceso puede añadir
+        # una sesión entre la comprobación y la actualización
+        with self.stats_cache.locked():
+            was_fresh = self.stats_cache.is_fresh()
+            session_id = self.backend.append_session(session_data)
+            self.stats_cache.session_added(session_data, was_fresh)
+        
+        if session_data.get('performance'):
+            self.save_session_metrics(session_id, session_data['performance'])
+        if session_data.get('timeline') is not None:
+            self.timelines.save(session_id, session_data['timeline'])
+        return session_id
+    
+    def save_session_metrics(self, session_id, metrics):
+        """Guarda las métricas de rendimiento de una sesión en un archivo aparte"""
+        if not os.path.exists(self.metrics_dir):
+            os.makedirs(self.metrics_dir)
+        path = os.path.join(self.metrics_dir, f"session_{session_id}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f, indent=2)
+    
+    def get_session_timeline(self, session_id, points=200):
+        """Timeline reducido de una sesión, o None si no se guardó"""
+        return self.timelines.downsample(session_id, points)
+    
+    def get_session_metrics(self, session_id):
+        """Métricas de rendimiento de una sesión, o None si no se guardaron"""
+        path = os.path.join(self.metrics_dir, f"session_{session_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
     
     def get_game_stats(self, game_name):
-        """Obtiene estadísticas acumuladas de un juego"""
-        stats = {
-            'total_sessions': 0,
-            'total_time': 0,
-            'total_happy': 0,
-            'total_angry': 0,
-            'total_neutral': 0,
-            'avg_rage_percentage': 0,
-            'avg_happy_percentage': 0,
-            'total_peak_rages': 0,
-            'total_happy_streaks': 0
-        }
+        """Obtiene estadísticas acumuladas de un juego (agregados cacheados)"""
+        return self.stats_cache.stats(game_name)
+    
+    def aggregate(self, group_by='game', date_from=None, date_to=None, game_name=None):
+        """Estadísticas de todos los grupos en una sola pasada.
         
-        if not os.path.exists(self.sessions_file):
-            return stats
+        Args:
+            group_by (str): 'game', 'genre', 'day' (YYYY-MM-DD) o 'week' (YYYY-Www)
+            date_from, date_to: días incluidos ("YYYY-MM-DD"), opcionales
+            game_name (str): limitar a las sesiones de un juego
         
-        with open(self.sessions_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row_game = str(row.get('game', ''))
-                if row_game.lower() == str(game_name).lower():
-                    stats['total_sessions'] += 1
-                    stats['total_time'] += int(row.get('duration_seconds', 0))
-                    stats['total_happy'] += int(row.get('happy_count', 0))
-                    stats['total_angry'] += int(row.get('angry_count', 0))
-                    stats['total_neutral'] += int(row.get('neutral_count', 0))
-                    
-                    # Nuevos campos
-                    stats['avg_rage_percentage'] += float(row.get('angry_percentage', 0))
-                    stats['avg_happy_percentage'] += float(row.get('happy_percentage', 0))
-                    stats['total_peak_rages'] += int(row.get('peak_rage_count', 0))
-                    stats['total_happy_streaks'] += int(row.get('happiness_streaks', 0))
+        Returns:
+            dict: grupo -> estadísticas con el formato de get_game_stats.
+                Por juego, la clave es el nombre registrado en la lista de
+                juegos (o el de la primera sesión si no está registrado).
+        """
+        if group_by not in ('game', 'genre', 'day', 'week'):
+            raise ValueError(f"Agrupación no soportada: {group_by}")
         
-        # Calcular promedios
-        if stats['total_sessions'] > 0:
-            stats['avg_rage_percentage'] /= stats['total_sessions']
-            stats['avg_happy_percentage'] /= stats['total_sessions']
+        records = self.backend.get_game_records() if group_by in ('game', 'genre') else []
+        names = {game_key(r['game_name']): r['game_name'] for r in records}
+        genres = {game_key(r['game_name']): r.get('genre') or 'Sin género' for r in records}
+        only_key = game_key(game_name) if game_name is not None else None
+        if group_by == 'game':
+            # Juegos sin registrar: el nombre de su primera sesión
+            for key, sums in self.stats_cache.sums().items():
+                names.setdefault(key, sums.get('game', key))
         
-        return stats
-    
-    def get_all_sessions(self, game_name=None):
-        """Obtiene todas las sesiones, opcionalmente filtradas por juego"""
-        sessions = []
+        # Sin ventana de fechas, el agregado por juego ya está cacheado
+        if group_by == 'game' and date_from is None and date_to is None:
+            sums = self.stats_cache.sums()
+            keys = [only_key] if only_key is not None else list(sums)
+            return {
+                names[key]: finalize_stats(sums[key])
+                for key in keys if key in sums
+            }
         
-        if not os.path.exists(self.sessions_file):
-            return sessions
+        groups = {}
+        for row in self.backend.iter_sessions(date_from, date_to):
+            key = game_key(row.get('game', ''))
+            if only_key is not None and key != only_key:
+                continue
+            if group_by == 'game':
+                group = names.setdefault(key, row.get('game', ''))
+            elif group_by == 'genre':
+                group = genres.get(key, 'Sin género')
+            else:
+                day = str(row.get('date') or '')[:10]
+                if group_by == 'week':
+                    try:
+                        year, week, _ = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+                    except ValueError:
+                        continue
+                    day = f"{year}-W{week:02d}"
+                group = day
+            accumulate(groups, group, row)
         
-        with open(self.sessions_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if game_name is None or str(row.get('game', '')).lower() == str(game_name).lower():
-                    sessions.append(row)
+        return {group: finalize_stats(sums) for group, sums in groups.items()}
+    
+    def analytics(self):
+        """Copia por columnas (NumPy) de las sesiones, puesta al día.
         
-        return sessions
+        Para analítica sobre historiales muy grandes: group_by('game'|'day'),
+        totals, percentiles y mean se calculan vectorizados. La copia vive en
+        data/columns y solo se crea la primera vez que se usa.
+        """
+        return self.columnar.sync(self.backend)
+    
+    def get_all_sessions(self, game_name=None):
+        """Obtiene todas las sesiones, opcionalmente filtradas por juego"""
+        return self.backend.get_all_sessions(game_name)
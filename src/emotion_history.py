@@ -0,0 +1,184 @@
+import tempfile
+
+import numpy as np
+
+
+# Códigos compactos de emoción (1 byte por registro)
+EMOTIONS = ("neutral", "happy", "angry")
+EMOTION_CODES = {emotion: code for code, emotion in enumerate(EMOTIONS)}
+
+# Registro del historial: 10 bytes por emoción contada
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("emotion", "u1"),
+    ("confidence", "u1"),
+])
+
+
+class EmotionHistory:
+    """Historial de emociones compacto y acotado en memoria.
+
+    Los registros se guardan en bloques NumPy de tipo fijo. Solo se mantienen
+    en memoria los `max_blocks_in_memory` bloques más recientes; los más
+    antiguos se vuelcan a un archivo temporal y se leen con memmap cuando
+    hace falta recorrer todo el historial. Así la memoria no crece con la
+    duración de la sesión y las tendencias y rachas se calculan de forma
+    vectorizada.
+    """
+
+    def __init__(self, block_size=4096, max_blocks_in_memory=4):
+        self.block_size = block_size
+        self.max_blocks_in_memory = max_blocks_in_memory
+        self._blocks = []
+        self._current = np.empty(block_size, dtype=RECORD_DTYPE)
+        self._fill = 0
+        self._spill = None
+        self._spilled = 0
+
+    def __len__(self):
+        return self._spilled + len(self._blocks) * self.block_size + self._fill
+
+    def append(self, timestamp, emotion, confidence):
+        """Añade un registro (emoción como texto, confianza 0-100)"""
+        record = self._current[self._fill]
+        record["timestamp"] = timestamp
+        record["emotion"] = EMOTION_CODES[emotion]
+        record["confidence"] = max(0, min(255, int(confidence)))
+        self._fill += 1
+        if self._fill == self.block_size:
+            self._seal_block()
+
+    def extend(self, records, time_offset=0.0):
+        """Añade un array de registros (RECORD_DTYPE), desplazando sus tiempos"""
+        records = np.asarray(records, dtype=RECORD_DTYPE)
+        start = 0
+        while start < len(records):
+            take = min(self.block_size - self._fill, len(records) - start)
+            chunk = self._current[self._fill:self._fill + take]
+            chunk[:] = records[start:start + take]
+            chunk["timestamp"] += time_offset
+            self._fill += take
+            start += take
+            if self._fill == self.block_size:
+                self._seal_block()
+
+    def _seal_block(self):
+        self._blocks.append(self._current)
+        self._current = np.empty(self.block_size, dtype=RECORD_DTYPE)
+        self._fill = 0
+        while len(self._blocks) > self.max_blocks_in_memory:
+            self._spill_block(self._blocks.pop(0))
+
+    def _spill_block(self, block):
+        # El archivo temporal se borra solo al cerrarse
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="rage_history_")
+        self._spill.seek(0, 2)
+        block.tofile(self._spill)
+        self._spill.flush()
+        self._spilled += len(block)
+
+    def iter_blocks(self, chunk_size=65536):
+        """Recorre el historial en orden cronológico, bloque a bloque"""
+        if self._spilled:
+            spilled = np.memmap(self._spill, dtype=RECORD_DTYPE, mode="r", shape=(self._spilled,))
+            for start in range(0, self._spilled, chunk_size):
+                yield spilled[start:start + chunk_size]
+        for block in self._blocks:
+            yield block
+        if self._fill:
+            yield self._current[:self._fill]
+
+    def records(self):
+        """Historial completo como un único array (copia)"""
+        blocks = list(self.iter_blocks())
+        if not blocks:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.concatenate(blocks)
+
+    def tail(self, count):
+        """Los últimos `count` registros"""
+        if count <= 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        parts = []
+        remaining = count
+        in_memory = list(self._blocks) + [self._current[:self._fill]]
+        for block in reversed(in_memory):
+            if remaining <= 0:
+                break
+            parts.append(block[-remaining:] if remaining < len(block) else block)
+            remaining -= min(remaining, len(block))
+        if remaining > 0 and self._spilled:
+            spilled = np.memmap(self._spill, dtype=RECORD_DTYPE, mode="r", shape=(self._spilled,))
+            parts.append(np.array(spilled[-remaining:]))
+        parts.reverse()
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD_DTYPE)
+
+    def count(self, emotion, min_confidence=None):
+        """Número de registros de una emoción, opcionalmente con confianza > min_confidence"""
+        code = EMOTION_CODES[emotion]
+        total = 0
+        for block in self.iter_blocks():
+            hits = block["emotion"] == code
+            if min_confidence is not None:
+                hits &= block["confidence"] > min_confidence
+            total += int(np.count_nonzero(hits))
+        return total
+
+    def trend(self, window=10):
+        """Emoción más frecuente entre los últimos `window` registros"""
+        recent = self.tail(window)
+        if len(recent) == 0:
+            return "neutral"
+        counts = np.bincount(recent["emotion"], minlength=len(EMOTIONS))
+        return EMOTIONS[int(counts.argmax())]
+
+    def streaks(self, emotion, min_count=3):
+        """Rachas cerradas de una emoción con al menos `min_count` registros.
+
+        Una racha termina cuando llega un registro de otra emoción; su
+        duración va desde su primer registro hasta ese cambio.
+
+        Returns:
+            list: dicts con 'count' y 'duration'
+        """
+        code = EMOTION_CODES[emotion]
+        streaks = []
+        # Racha abierta al final del bloque anterior: (código, registros, inicio)
+        carry = None
+
+        for block in self.iter_blocks():
+            codes = block["emotion"]
+            if len(codes) == 0:
+                continue
+            # Rachas dentro del bloque (run-length encoding vectorizado)
+            starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+            run_codes = codes[starts].astype(np.int16)
+            run_counts = np.diff(np.concatenate((starts, [len(codes)])))
+            run_times = block["timestamp"][starts].astype(np.float64)
+
+            if carry is not None:
+                if carry[0] == run_codes[0]:
+                    run_counts[0] += carry[1]
+                    run_times[0] = carry[2]
+                else:
+                    run_codes = np.concatenate(([carry[0]], run_codes))
+                    run_counts = np.concatenate(([carry[1]], run_counts))
+                    run_times = np.concatenate(([carry[2]], run_times))
+
+            # Todas las rachas menos la última están cerradas por la siguiente
+            closed = (run_codes[:-1] == code) & (run_counts[:-1] >= min_count)
+            durations = run_times[1:] - run_times[:-1]
+            streaks.extend(
+                {'count': int(count), 'duration': float(duration)}
+                for count, duration in zip(run_counts[:-1][closed], durations[closed])
+            )
+            carry = (run_codes[-1], run_counts[-1], run_times[-1])
+
+        return streaks
+
+    def clear(self):
+        """Vacía el historial y libera el archivo temporal"""
+        if self._spill is not None:
+            self._spill.close()
+        self.__init__(self.block_size, self.max_blocks_in_memory)
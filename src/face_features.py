@@ -0,0 +1,39 @@
+from functools import cached_property
+
+
+class FaceFeatures:
+    """Características de una cara calculadas solo cuando se piden.
+
+    Cada característica se evalúa la primera vez que la lógica de decisión la
+    necesita y queda cacheada. Los cascades se ejecutan solo sobre su franja
+    de la cara (sonrisa en la parte inferior, ojos en la superior).
+    """
+
+    def __init__(self, roi_gray, smile_cascade, eye_cascade, config):
+        self.roi_gray = roi_gray
+        self.height = roi_gray.shape[0]
+        self.smile_cascade = smile_cascade
+        self.eye_cascade = eye_cascade
+        self.config = config
+
+    @cached_property
+    def smiles(self):
+        """Sonrisas detectadas en la parte inferior de la cara"""
+        start = int(self.height * self.config['smile_region_start'])
+        return self.smile_cascade.detectMultiScale(
+            self.roi_gray[start:, :],
+            scaleFactor=self.config['smile_scale_factor'],
+            minNeighbors=self.config['smile_min_neighbors'],
+            minSize=self.config['smile_min_size']
+        )
+
+    @cached_property
+    def eyes(self):
+        """Ojos detectados en la franja superior de la cara"""
+        end = int(self.height * self.config['eye_region_end'])
+        return self.eye_cascade.detectMultiScale(
+            self.roi_gray[:end, :],
+            scaleFactor=self.config['eye_scale_factor'],
+            minNeighbors=self.config['eye_min_neighbors'],
+            minSize=self.config['eye_min_size']
+        )
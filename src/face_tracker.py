@@ -0,0 +1,160 @@
+import cv2
+
+
+# Tamaño de la ventana base del cascade frontal; no se puede buscar por debajo
+CASCADE_MIN_WINDOW = 24
+
+
+class FaceTracker:
+    """Seguimiento de la cara entre detecciones completas.
+
+    El detector de caras sobre el frame entero es la etapa más cara del
+    pipeline. Como la cara del jugador apenas se mueve, solo se hace una
+    búsqueda completa cada `full_detect_interval` frames, cuando la cara no
+    aparece en la ventana o cuando la caja seguida se ha alejado demasiado
+    (posición o tamaño) de la última detección completa; el resto de frames
+    se busca únicamente en una ventana alrededor de la última caja, con
+    minSize/maxSize ajustados al tamaño de la última cara.
+
+    Si se indica `detect_width`, el cascade trabaja sobre una copia reducida
+    de la imagen (a ese ancho, o más si hace falta para no perder caras de
+    `min_size`) y las cajas se devuelven reescaladas a la resolución
+    completa, así el análisis de sonrisa y ojos sigue usando ROIs a
+    resolución original.
+    """
+
+    def __init__(self, cascade, enabled=True, full_detect_interval=15, padding=0.5,
+                 size_tolerance=0.3, scale_factor=1.3, min_neighbors=5, min_size=(100, 100),
+                 tracking_scale_factor=1.1, detect_width=320, max_drift=0.5):
+        self.cascade = cascade
+        self.enabled = enabled
+        self.full_detect_interval = full_detect_interval
+        self.padding = padding
+        self.size_tolerance = size_tolerance
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = tuple(min_size)
+        self.tracking_scale_factor = tracking_scale_factor
+        self.detect_width = detect_width
+        self.max_drift = max_drift
+        self._scale_cache = (None, 1.0)
+
+        self.last_face = None
+        # Caja de la última detección completa: referencia para medir la deriva
+        self.anchor_face = None
+        self.frames_since_full = 0
+        self.full_detections = 0
+        self.tracked_detections = 0
+
+    def invalidate(self):
+        """Fuerza una detección completa en el siguiente frame"""
+        self.last_face = None
+
+    def drifted(self, face):
+        """True si la caja seguida se ha desplazado más de `max_drift` anchos
+        de cara, o ha cambiado de tamaño más de `size_tolerance`, respecto a
+        la última detección completa"""
+        if self.anchor_face is None:
+            return False
+        ax, ay, aw, ah = self.anchor_face
+        x, y, w, h = face
+        dx = (x + w / 2) - (ax + aw / 2)
+        dy = (y + h / 2) - (ay + ah / 2)
+        if dx * dx + dy * dy > (self.max_drift * aw) ** 2:
+            return True
+        return abs(w / aw - 1.0) > self.size_tolerance
+
+    def detect(self, gray):
+        """Devuelve las caras (x, y, w, h) en coordenadas del frame completo"""
+        faces = []
+        needs_full = (
+            not self.enabled
+            or self.last_face is None
+            or self.frames_since_full >= self.full_detect_interval
+        )
+
+        if not needs_full:
+            faces = self._detect_in_window(gray)
+            self.frames_since_full += 1
+            # La caja se fue alejando de la última detección completa: se descarta
+            if faces and self.drifted(faces[0]):
+                faces = []
+            if faces:
+                self.tracked_detections += 1
+
+        # Cara perdida en la ventana (o a la deriva): se busca en todo el frame
+        if not faces:
+            faces = self._detect_full(gray)
+            self.frames_since_full = 0
+            self.full_detections += 1
+            self.anchor_face = faces[0] if faces else None
+
+        self.last_face = faces[0] if faces else None
+        return faces
+
+    def detection_scale(self, frame_width):
+        """Factor de reducción para una resolución dada (1.0 = sin reducir).
+
+        Nunca se reduce tanto que `min_size` quede por debajo de la ventana
+        base del cascade: así una cara del tamaño mínimo configurado sigue
+        siendo detectable aunque la resolución sea alta.
+        """
+        cached_width, scale = self._scale_cache
+        if cached_width != frame_width:
+            scale = 1.0
+            if self.detect_width and frame_width > self.detect_width:
+                min_scale = CASCADE_MIN_WINDOW / max(1, min(self.min_size))
+                scale = min(1.0, max(self.detect_width / frame_width, min_scale))
+            self._scale_cache = (frame_width, scale)
+        return scale
+
+    def _run_cascade(self, image, scale, scale_factor, min_size, max_size=None):
+        """Ejecuta el cascade a escala reducida y devuelve cajas a escala original"""
+        params = {
+            'scaleFactor': scale_factor,
+            'minNeighbors': self.min_neighbors,
+        }
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            min_size = tuple(max(CASCADE_MIN_WINDOW, int(v * scale)) for v in min_size)
+            if max_size is not None:
+                max_size = tuple(max(CASCADE_MIN_WINDOW, int(v * scale)) for v in max_size)
+        params['minSize'] = min_size
+        if max_size is not None:
+            params['maxSize'] = max_size
+
+        faces = self.cascade.detectMultiScale(image, **params)
+        return [tuple(int(round(v / scale)) for v in face) for face in faces]
+
+    def _detect_full(self, gray):
+        scale = self.detection_scale(gray.shape[1])
+        return self._run_cascade(gray, scale, self.scale_factor, self.min_size)
+
+    def _detect_in_window(self, gray):
+        x, y, w, h = self.last_face
+        frame_h, frame_w = gray.shape[:2]
+
+        # Ventana de búsqueda: la última caja ampliada por `padding`
+        pad_x = int(w * self.padding)
+        pad_y = int(h * self.padding)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(frame_w, x + w + pad_x), min(frame_h, y + h + pad_y)
+
+        # Tamaños admitidos alrededor del último tamaño de cara
+        low = 1.0 - self.size_tolerance
+        high = 1.0 + self.size_tolerance
+        min_size = (max(self.min_size[0], int(w * low)), max(self.min_size[1], int(h * low)))
+        max_size = (int(w * high), int(h * high))
+        if max_size[0] < min_size[0] or max_size[1] < min_size[1]:
+            return []
+
+        scale = self.detection_scale(frame_w)
+        faces = self._run_cascade(
+            gray[y0:y1, x0:x1], scale, self.tracking_scale_factor, min_size, max_size
+        )
+        faces = [(fx + x0, fy + y0, fw, fh) for fx, fy, fw, fh in faces]
+
+        # La más cercana a la posición anterior primero
+        cx, cy = x + w / 2, y + h / 2
+        faces.sort(key=lambda f: (f[0] + f[2] / 2 - cx) ** 2 + (f[1] + f[3] / 2 - cy) ** 2)
+        return faces
@@ -0,0 +1,63 @@
+import csv
+import io
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def locked(f):
+    """Bloqueo exclusivo (entre procesos) sobre un archivo abierto en binario"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        # msvcrt bloquea bytes desde la posición actual: se usa el primero
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield f
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def csv_line(values):
+    """Una fila CSV ya codificada en UTF-8"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode('utf-8')
+
+
+def append_locked(path, data, before_write=None):
+    """Añade `data` al final de un archivo con bloqueo y de una sola escritura.
+
+    Si la última línea quedó a medias (por ejemplo, por un corte), se
+    termina antes para no pegar dos filas. `before_write(f)` se llama con el
+    bloqueo ya tomado, por si hay que comprobar algo antes de escribir;
+    si devuelve False no se escribe nada.
+
+    Returns:
+        os.stat_result del archivo tras escribir, o None si no se escribió
+    """
+    with open(path, 'a+b') as f:
+        with locked(f):
+            if before_write is not None and before_write(f) is False:
+                return None
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) not in (b'\n', b'\r'):
+                    data = b'\n' + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            return os.fstat(f.fileno())
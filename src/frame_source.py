@@ -0,0 +1,188 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tif", ".tiff")
+
+
+class FrameSource:
+    """Interfaz común de las fuentes de frames (compatible con cv2.VideoCapture).
+
+    Cada fuente expone isOpened/read/release y además `timestamp`, el tiempo
+    en segundos del último frame leído (tiempo real para la cámara, tiempo
+    del medio para archivos grabados).
+    """
+
+    fps = 30.0
+    timestamp = 0.0
+
+    def isOpened(self):
+        return False
+
+    def read(self):
+        return False, None
+
+    def release(self):
+        pass
+
+    def frame_count(self):
+        """Número total de frames, o None si la fuente no tiene fin"""
+        return None
+
+
+class CameraSource(FrameSource):
+    """Webcam en vivo"""
+
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._opened_at = time.time()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        ret, frame = self.cap.read()
+        self.timestamp = time.time() - self._opened_at
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Vídeo grabado, opcionalmente limitado al rango [start_frame, end_frame)"""
+
+    def __init__(self, path, start_frame=0, end_frame=None):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.start_frame = start_frame
+        self.end_frame = total if end_frame is None else min(end_frame, total)
+        self.position = start_frame
+        if start_frame:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        if self.position >= self.end_frame:
+            return False, None
+        ret, frame = self.cap.read()
+        if ret:
+            self.timestamp = self.position / self.fps
+            self.position += 1
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+    def frame_count(self):
+        return max(0, self.end_frame - self.start_frame)
+
+
+class ImageDirectorySource(FrameSource):
+    """Directorio de imágenes leído en orden alfabético a `fps` frames por segundo"""
+
+    def __init__(self, path, fps=30.0, start_frame=0, end_frame=None):
+        self.path = path
+        self.fps = fps
+        files = sorted(
+            f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS)
+        ) if os.path.isdir(path) else []
+        self.files = files
+        self.start_frame = start_frame
+        self.end_frame = len(files) if end_frame is None else min(end_frame, len(files))
+        self.position = start_frame
+
+    def isOpened(self):
+        return len(self.files) > 0
+
+    def read(self):
+        while self.position < self.end_frame:
+            index = self.position
+            self.position += 1
+            frame = cv2.imread(os.path.join(self.path, self.files[index]))
+            if frame is not None:
+                self.timestamp = index / self.fps
+                return True, frame
+        return False, None
+
+    def frame_count(self):
+        return max(0, self.end_frame - self.start_frame)
+
+
+class SyntheticSource(FrameSource):
+    """Generador de frames sintéticos reproducibles (pruebas sin cámara)"""
+
+    def __init__(self, width=640, height=480, frames=300, fps=30.0, seed=0, start_frame=0):
+        self.width = width
+        self.height = height
+        self.frames = frames  # None = infinito
+        self.fps = fps
+        self.start_frame = start_frame
+        self.position = start_frame
+
+        # Fondo con ruido y un óvalo claro con "ojos" y "boca" a modo de cara
+        rng = np.random.default_rng(seed)
+        base = rng.integers(40, 90, size=(height, width, 3), dtype=np.uint8)
+        center = (width // 2, height // 2)
+        axes = (max(1, width // 8), max(1, height // 4))
+        cv2.ellipse(base, center, axes, 0, 0, 360, (170, 180, 200), -1)
+        eye_y = center[1] - axes[1] // 3
+        for dx in (-axes[0] // 2, axes[0] // 2):
+            cv2.circle(base, (center[0] + dx, eye_y), max(1, axes[0] // 6), (40, 40, 40), -1)
+        cv2.ellipse(base, (center[0], center[1] + axes[1] // 2),
+                    (max(1, axes[0] // 2), max(1, axes[1] // 8)), 0, 0, 180, (60, 40, 40), -1)
+        self._base = base
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.frames is not None and self.position >= self.frames:
+            return False, None
+        # Pequeño desplazamiento por frame para simular movimiento
+        shift = (self.position % 20) - 10
+        frame = np.roll(self._base, shift, axis=1)
+        self.timestamp = self.position / self.fps
+        self.position += 1
+        return True, frame
+
+    def frame_count(self):
+        if self.frames is None:
+            return None
+        return max(0, self.frames - self.start_frame)
+
+
+def open_source(spec, start_frame=0, end_frame=None):
+    """Crea una fuente de frames a partir de una especificación.
+
+    Args:
+        spec: índice de cámara (int o "camera:N"), "synthetic[:WxH[:frames]]",
+              ruta a un directorio de imágenes o ruta a un vídeo
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int):
+        return CameraSource(spec)
+
+    spec = str(spec)
+    if spec.startswith("camera"):
+        _, _, index = spec.partition(":")
+        return CameraSource(int(index or 0))
+    if spec.startswith("synthetic"):
+        parts = spec.split(":")[1:]
+        width, height = (int(v) for v in parts[0].split("x")) if parts else (640, 480)
+        frames = int(parts[1]) if len(parts) > 1 else None
+        if end_frame is not None:
+            frames = end_frame if frames is None else min(frames, end_frame)
+        return SyntheticSource(width, height, frames=frames, start_frame=start_frame)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, start_frame=start_frame, end_frame=end_frame)
+    return VideoFileSource(spec, start_frame=start_frame, end_frame=end_frame)
@@ -0,0 +1,110 @@
+import csv
+import io
+import os
+from datetime import datetime
+
+from src.file_lock import append_locked, csv_line
+
+
+GAME_FIELDS = ['game_name', 'date_added', 'genre', 'notes']
+
+
+def game_key(game_name):
+    """Clave normalizada de un juego para comparar nombres sin mayúsculas"""
+    return str(game_name).casefold()
+
+
+class GamesRegistry:
+    """Lista de juegos de games.csv con un índice por nombre normalizado.
+
+    El archivo se lee una vez y solo se vuelve a leer cuando cambian su
+    tamaño o su mtime (otro proceso añadió un juego), así que comprobar si
+    un juego existe es una búsqueda en un dict. Los juegos nuevos se añaden
+    al final con bloqueo de archivo, de modo que el tracker, la herramienta
+    de configuración y el dashboard pueden compartirlo. Si el archivo no se
+    puede leer se conserva la última lista válida: nunca se reescribe.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._records = []
+        self._index = {}
+        self._stamp = None
+        self.reloads = 0
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp != self._stamp:
+            with open(self.path, 'rb') as f:
+                self._parse(f.read())
+            self._stamp = stamp
+
+    def _parse(self, content):
+        try:
+            rows = list(csv.DictReader(io.StringIO(content.decode('utf-8', errors='replace'))))
+        except csv.Error:
+            print(f"⚠️  No se pudo leer {self.path}; se mantiene la lista de juegos anterior")
+            return
+        records, index = [], {}
+        for row in rows:
+            name = row.get('game_name')
+            if not name or game_key(name) in index:
+                continue
+            record = {field: row.get(field) or '' for field in GAME_FIELDS}
+            index[game_key(name)] = record
+            records.append(record)
+        self._records = records
+        self._index = index
+        self.reloads += 1
+
+    def names(self):
+        self._refresh()
+        return [record['game_name'] for record in self._records]
+
+    def records(self):
+        self._refresh()
+        return list(self._records)
+
+    def get(self, game_name):
+        """Registro de un juego (sin distinguir mayúsculas) o None"""
+        self._refresh()
+        return self._index.get(game_key(game_name))
+
+    def exists(self, game_name):
+        return self.get(game_name) is not None
+
+    def add(self, game_name, genre="", notes=""):
+        """Añade un juego si no existe. Devuelve False si ya estaba."""
+        if self.exists(game_name):
+            return False
+
+        record = {
+            'game_name': game_name,
+            'date_added': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'genre': genre,
+            'notes': notes,
+        }
+
+        def not_added_meanwhile(f):
+            # Con el bloqueo tomado: otro proceso pudo añadirlo justo antes
+            self._refresh()
+            return not self.exists(game_name)
+
+        needs_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        data = csv_line([record[field] for field in GAME_FIELDS])
+        if needs_header:
+            data = csv_line(GAME_FIELDS) + data
+
+        stat = append_locked(self.path, data, before_write=not_added_meanwhile)
+        if stat is None:
+            return False
+
+        # La fila propia se incorpora sin volver a leer el archivo
+        self._index[game_key(game_name)] = record
+        self._records.append(record)
+        self._stamp = (stat.st_size, stat.st_mtime_ns)
+        return True
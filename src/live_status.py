@@ -0,0 +1,86 @@
+import json
+import os
+import time
+
+
+LIVE_FILE = os.path.join("data", "live.json")
+
+# Un estado activo sin actualizar en este tiempo es de un tracker que ya no corre
+STALE_AFTER = 10.0
+
+
+class LivePublisher:
+    """Publica el estado de la sesión en curso en un archivo compartido.
+
+    Cada `interval` segundos como máximo se reemplaza data/live.json de forma
+    atómica (archivo temporal + os.replace), así que un lector nunca ve un
+    JSON a medias. El servidor del dashboard lo vigila y lo retransmite.
+    Funciona igual en Windows, Linux y macOS sin sockets ni memoria
+    compartida específica de cada sistema.
+    """
+
+    def __init__(self, path=LIVE_FILE, interval=0.5):
+        self.path = path
+        self.interval = interval
+        self._last_publish = None
+        self.published = 0
+
+    @property
+    def enabled(self):
+        return bool(self.interval)
+
+    def publish(self, build, now=None):
+        """Publica build() si ha pasado el intervalo desde la última vez.
+
+        Args:
+            build: función que devuelve el dict de estado (solo se llama
+                cuando toca publicar)
+            now (float): instante actual (time.perf_counter por defecto)
+        """
+        if not self.enabled:
+            return False
+        now = time.perf_counter() if now is None else now
+        if self._last_publish is not None and now - self._last_publish < self.interval:
+            return False
+        self._last_publish = now
+        return self._write(dict(build(), active=True))
+
+    def finish(self, state):
+        """Publica el estado final y marca la sesión como terminada"""
+        if not self.enabled:
+            return False
+        return self._write(dict(state, active=False))
+
+    def _write(self, state):
+        state['updated_at'] = time.time()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # En Windows el reemplazo falla si alguien tiene el archivo abierto:
+            # se pierde este estado, el siguiente llegará en `interval` segundos
+            return False
+        self.published += 1
+        return True
+
+
+def read_live_status(path=LIVE_FILE, stale_after=STALE_AFTER):
+    """Último estado publicado, o None si no hay ninguno legible.
+
+    Un estado "activo" que lleva más de `stale_after` segundos sin
+    actualizarse se devuelve como inactivo (el tracker se cerró sin avisar).
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('active') and time.time() - state.get('updated_at', 0) > stale_after:
+        state['active'] = False
+        state['stale'] = True
+    return state
@@ -191,12 +191,15 @@ class Menu:
             
             print("Selecciona un juego para ver sus estadísticas:\n")
             
+            # Estadísticas de todos los juegos de una sola vez
+            all_stats = self.data_manager.aggregate('game')
+            
             # Mostrar lista de juegos con resumen rápido de estadísticas
             for i, game_name in enumerate(games, 1):
-                stats = self.data_manager.get_game_stats(game_name)
+                stats = all_stats.get(game_name)
                 print(f"{i}. {game_name}")
                 # Mostrar resumen si hay sesiones
-                if stats['total_sessions'] > 0:
+                if stats and stats['total_sessions'] > 0:
                     print(f"   └─ {stats['total_sessions']} sesiones | "
                           f"😠 {stats['total_angry']} | 😊 {stats['total_happy']}")
             
@@ -236,6 +239,7 @@ class Menu:
         - Total de sesiones y tiempo jugado
         - Contadores de emociones (enfadado, feliz, neutral)
         - Rage Index (porcentaje de veces enfadado)
+        - Resumen de las últimas 4 semanas
         - Últimas 5 sesiones con detalle
         """
         self.clear_screen()
@@ -243,6 +247,7 @@ class Menu:
         
         # Obtener estadísticas generales y lista de sesiones
         stats = self.data_manager.get_game_stats(game_name)
+        weekly = self.data_manager.aggregate('week', game_name=game_name)
         sessions = self.data_manager.get_all_sessions(game_name)
         
         # Mostrar mensaje si no hay sesiones
@@ -265,6 +270,14 @@ class Menu:
                 rage_percentage = (stats['total_angry'] / total_emotions) * 100
                 print(f"\n🔥 Rage Index: {rage_percentage:.1f}%")
             
+            # Mostrar la evolución semanal (rage medio por sesión)
+            if weekly:
+                print(f"\n--- Últimas semanas ---")
+                for week in sorted(weekly)[-4:]:
+                    week_stats = weekly[week]
+                    print(f"  {week} | {week_stats['total_sessions']} sesiones | "
+                          f"😠 {week_stats['avg_rage_percentage']:.1f}%")
+            
             # Mostrar las últimas 5 sesiones con detalles
             print(f"\n--- Últimas 5 sesiones ---")
             for session in sessions[-5:]:
@@ -0,0 +1,91 @@
+import time
+from collections import deque
+
+
+class RollingHistogram:
+    """Ventana deslizante de duraciones con percentiles bajo demanda"""
+
+    def __init__(self, size=300):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+    def percentiles(self, *ps):
+        """Percentiles (en segundos) de las muestras de la ventana"""
+        if not self.samples:
+            return [0.0 for _ in ps]
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(p / 100 * last)))] for p in ps]
+
+
+class PipelineMetrics:
+    """Temporizadores por etapa del bucle de run() y FPS conseguidos.
+
+    Registrar una muestra es solo un append; los percentiles se recalculan
+    como mucho cada `refresh_interval` segundos para que dibujarlos en el
+    overlay no añada coste al bucle.
+    """
+
+    STAGES = ("capture_wait", "detect", "overlay", "display")
+
+    def __init__(self, window=300, refresh_interval=0.5):
+        self.histograms = {stage: RollingHistogram(window) for stage in self.STAGES}
+        self.frame_times = deque(maxlen=window)
+        # Contadores de eventos (p. ej. refrescos de ventana negados por el presupuesto)
+        self.counters = {}
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._snapshot_at = 0.0
+
+    def record(self, stage, seconds):
+        self.histograms[stage].add(seconds)
+
+    def count(self, event, n=1):
+        self.counters[event] = self.counters.get(event, 0) + n
+
+    def frame_done(self, now=None):
+        """Marca el final de un frame mostrado (para calcular los FPS)"""
+        self.frame_times.append(time.perf_counter() if now is None else now)
+
+    def fps(self):
+        if len(self.frame_times) < 2:
+            return 0.0
+        elapsed = self.frame_times[-1] - self.frame_times[0]
+        return (len(self.frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self, force=False):
+        """FPS y p50/p95/p99 por etapa en milisegundos (cacheado)"""
+        now = time.perf_counter()
+        if force or self._snapshot is None or now - self._snapshot_at >= self.refresh_interval:
+            stages = {}
+            for stage, histogram in self.histograms.items():
+                p50, p95, p99 = histogram.percentiles(50, 95, 99)
+                stages[stage] = {
+                    'p50_ms': round(p50 * 1000, 2),
+                    'p95_ms': round(p95 * 1000, 2),
+                    'p99_ms': round(p99 * 1000, 2),
+                    'max_ms': round(histogram.worst * 1000, 2),
+                    'samples': histogram.count,
+                }
+            self._snapshot = {'fps': round(self.fps(), 1), 'stages': stages, 'counters': dict(self.counters)}
+            self._snapshot_at = now
+        return self._snapshot
+
+    def overlay_lines(self):
+        """Líneas de texto para el overlay de depuración"""
+        snapshot = self.snapshot()
+        lines = [f"FPS: {snapshot['fps']:.1f}"]
+        for stage in self.STAGES:
+            s = snapshot['stages'][stage]
+            lines.append(f"{stage}: {s['p50_ms']:.1f}/{s['p95_ms']:.1f}/{s['p99_ms']:.1f} ms")
+        for event, n in snapshot['counters'].items():
+            lines.append(f"{event}: {n}")
+        return lines
@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+
+class CachedLayer:
+    """Capa de texto renderizada una sola vez y reutilizada mientras no cambie.
+
+    `update` solo vuelve a dibujar si cambia la clave (contadores, estado,
+    segundo mostrado...) o el tamaño; `blit` copia sobre el frame únicamente
+    los píxeles dibujados (o el rectángulo completo si la capa es opaca).
+    """
+
+    def __init__(self, opaque=False):
+        self.opaque = opaque
+        self.key = None
+        self.image = None
+        self.mask = None
+        self.size = None
+        self.offset = (0, 0)
+        self.renders = 0
+
+    def update(self, key, size, render):
+        height, width = size
+        if self.image is not None and self.key == key and self.size == (height, width):
+            return
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        render(image)
+        self.size = (height, width)
+        self.key = key
+        self.renders += 1
+        self.offset = (0, 0)
+        if self.opaque:
+            self.image, self.mask = image, None
+            return
+
+        # Se guarda solo el rectángulo que contiene texto para copiar lo mínimo
+        mask = image.any(axis=2)
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if rows.size == 0:
+            self.image = image[:0, :0]
+            self.mask = mask[:0, :0, None]
+            return
+        y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+        self.image = image[y0:y1, x0:x1].copy()
+        self.mask = mask[y0:y1, x0:x1, None].copy()
+        self.offset = (int(x0), int(y0))
+
+    def blit(self, frame, x, y):
+        x += self.offset[0]
+        y += self.offset[1]
+        height = min(self.image.shape[0], frame.shape[0] - y)
+        width = min(self.image.shape[1], frame.shape[1] - x)
+        if height <= 0 or width <= 0:
+            return
+        roi = frame[y:y + height, x:x + width]
+        if self.opaque:
+            roi[:] = self.image[:height, :width]
+        else:
+            np.copyto(roi, self.image[:height, :width], where=self.mask[:height, :width])
+
+
+class OverlayCompositor:
+    """Compositor del overlay: oscurece solo el panel y pega capas cacheadas.
+
+    Sustituye al frame.copy() + addWeighted sobre el frame completo: el
+    fundido se limita al rectángulo del panel y el texto se reutiliza
+    mientras no cambie lo que se muestra.
+    """
+
+    def __init__(self, panel_rect=(10, 10, 450, 270), opacity=0.7):
+        self.panel_rect = panel_rect
+        self.opacity = opacity
+        self.panel = CachedLayer()
+        self.footer = CachedLayer()
+        self.debug = CachedLayer(opaque=True)
+
+    def blend_panel(self, frame):
+        """Fondo semitransparente negro solo en la región del panel"""
+        x0, y0, x1, y1 = self.panel_rect
+        x1 = min(x1 + 1, frame.shape[1])
+        y1 = min(y1 + 1, frame.shape[0])
+        if x1 <= x0 or y1 <= y0:
+            return
+        roi = frame[y0:y1, x0:x1]
+        roi[:] = cv2.convertScaleAbs(roi, alpha=1.0 - self.opacity)
+
+    @property
+    def renders(self):
+        """Veces que se ha redibujado alguna capa (útil para depurar la caché)"""
+        return self.panel.renders + self.footer.renders + self.debug.renders
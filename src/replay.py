@@ -0,0 +1,151 @@
+"""
+RAGE TRACKER - Replay offline
+Procesa vídeos grabados o directorios de imágenes sin ventana, tan rápido
+como permita la CPU, opcionalmente repartiendo rangos de tiempo entre varios
+procesos y fusionando los resultados en una única sesión.
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Permite ejecutar el módulo como script desde la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.camera import EmotionDetector
+from src.frame_source import open_source
+
+
+def replay(game_name, source):
+    """Ejecuta el pipeline completo sobre una fuente sin mostrar nada.
+
+    Args:
+        game_name (str): Juego al que se asigna la sesión
+        source: FrameSource o especificación aceptada por open_source
+
+    Returns:
+        EmotionDetector: detector con el estado final de la sesión
+    """
+    source = open_source(source)
+    detector = EmotionDetector(game_name, clock=lambda: source.timestamp)
+    # En replay el tiempo es el del medio, que empieza en el primer frame leído
+    detector.start_time = None
+
+    try:
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            if detector.start_time is None:
+                detector.start_time = source.timestamp
+            detector.process_frame(frame)
+    finally:
+        source.release()
+
+    if detector.start_time is None:
+        detector.start_time = source.timestamp
+    return detector
+
+
+def export_state(detector):
+    """Extrae el estado acumulado de un detector (serializable entre procesos)"""
+    return {
+        'start_time': detector.start_time,
+        'end_time': detector.clock(),
+        'emotion_counts': dict(detector.emotion_counts),
+        'emotion_history': detector.emotion_history.records(),
+        'total_frames': detector.total_frames,
+    }
+
+
+def merge_states(game_name, states):
+    """Fusiona estados parciales (ordenados por tiempo) en un único detector.
+
+    La confirmación de emociones se reinicia en cada frontera entre rangos;
+    las rachas se recalculan sobre el historial ya fusionado.
+    """
+    states = [s for s in states if s['total_frames'] > 0]
+    end_time = max((s['end_time'] for s in states), default=0.0)
+    detector = EmotionDetector(game_name, clock=lambda: end_time)
+    detector.start_time = min((s['start_time'] for s in states), default=0.0)
+
+    for state in sorted(states, key=lambda s: s['start_time']):
+        for emotion, count in state['emotion_counts'].items():
+            detector.emotion_counts[emotion] += count
+        # Los timestamps parciales son relativos a su rango; se pasan a la sesión
+        offset = state['start_time'] - detector.start_time
+        detector.emotion_history.extend(state['emotion_history'], time_offset=offset)
+        detector.total_frames += state['total_frames']
+
+    return detector
+
+
+def _replay_range(game_name, spec, start_frame, end_frame):
+    """Trabajo de un proceso: procesa un rango de frames y devuelve su estado"""
+    return export_state(replay(game_name, open_source(spec, start_frame, end_frame)))
+
+
+def replay_parallel(game_name, spec, workers=None):
+    """Reparte la fuente en rangos de tiempo entre varios procesos.
+
+    Args:
+        game_name (str): Juego al que se asigna la sesión
+        spec (str): Ruta a un vídeo/directorio o "synthetic:WxH:frames"
+        workers (int): Número de procesos (por defecto, uno por CPU)
+
+    Returns:
+        EmotionDetector: detector con la sesión fusionada
+    """
+    workers = workers or os.cpu_count() or 1
+    probe = open_source(spec)
+    total = probe.frame_count()
+    probe.release()
+
+    if total is None:
+        raise ValueError("La fuente no tiene longitud conocida; no se puede dividir")
+    if workers <= 1 or total < workers * 2:
+        return replay(game_name, spec)
+
+    chunk = -(-total // workers)
+    ranges = [(start, min(start + chunk, total)) for start in range(0, total, chunk)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_replay_range, game_name, spec, start, end)
+            for start, end in ranges
+        ]
+        states = [f.result() for f in futures]
+
+    return merge_states(game_name, states)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-analiza sesiones grabadas sin ventana")
+    parser.add_argument("source", help="Vídeo, directorio de imágenes o synthetic:WxH:frames")
+    parser.add_argument("--game", required=True, help="Nombre del juego")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos en paralelo (0 = uno por CPU)")
+    parser.add_argument("--save", action="store_true", help="Guardar la sesión en data/")
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        detector = replay(args.game, args.source)
+    else:
+        detector = replay_parallel(args.game, args.source, args.workers or None)
+
+    summary = detector.get_session_summary()
+    print(f"\n🎞️  Replay completado: {summary['total_frames']} frames "
+          f"({summary['duration_seconds']} seg de vídeo)")
+    print(f"  😊 Feliz: {summary['happy_count']} ({summary['happy_percentage']:.1f}%)")
+    print(f"  😠 Enfadado: {summary['angry_count']} ({summary['angry_percentage']:.1f}%)")
+    print(f"  😐 Neutral: {summary['neutral_count']} ({summary['neutral_percentage']:.1f}%)")
+
+    if args.save:
+        from src.data_manager import DataManager
+        DataManager().save_session(summary)
+        print("\n✅ Sesión guardada.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import time
+
+
+class AdaptiveScheduler:
+    """Planificador de frames según una frecuencia objetivo o un presupuesto de CPU.
+
+    Mide lo que tarda cada etapa (media móvil exponencial) y decide en cada
+    frame si toca detectar, si basta con refrescar la ventana o si conviene
+    dormir. El presupuesto de CPU funciona como un cubo de fichas: cada
+    segundo se recargan `cpu_budget` segundos de trabajo y cada etapa gasta
+    lo que tarda. La detección tiene prioridad: solo se refresca la ventana
+    si después sigue quedando saldo para la próxima detección, salvo para
+    mantener `min_display_hz`, que se reserva aparte del presupuesto. Cada
+    refresco negado por falta de saldo se cuenta en `throttled_displays` (y
+    en `metrics` como 'display_throttled').
+
+    Args:
+        target_hz (float): Veredictos por segundo deseados (None = sin límite)
+        cpu_budget (float): Fracción de un núcleo disponible, p. ej. 0.15 (None = sin límite)
+        display_hz (float): Frecuencia máxima de refresco de la ventana
+        min_display_hz (float): Refrescos por segundo garantizados aunque no haya saldo
+        metrics: PipelineMetrics opcional donde contar los refrescos negados
+    """
+
+    # Límites del tiempo de espera entre iteraciones (segundos)
+    MIN_SLEEP = 0.001
+    MAX_SLEEP = 0.1
+
+    def __init__(self, target_hz=None, cpu_budget=None, display_hz=30.0, smoothing=0.2,
+                 min_display_hz=5.0, metrics=None):
+        self.target_hz = target_hz
+        self.cpu_budget = cpu_budget
+        self.display_hz = display_hz
+        self.min_display_hz = min(min_display_hz or 0, display_hz)
+        self.smoothing = smoothing
+        self.metrics = metrics
+
+        self.stage_costs = {}
+        self.detections = 0
+        self.skipped = 0
+        self.throttled_displays = 0
+
+        self._last_detect = None
+        self._last_display = None
+        self._tokens = 0.0
+        self._last_refill = time.perf_counter()
+
+    @property
+    def active(self):
+        """True si hay algún objetivo que obligue a saltarse frames"""
+        return bool(self.target_hz) or bool(self.cpu_budget)
+
+    def cost(self, stage):
+        """Coste medio estimado de una etapa (segundos)"""
+        return self.stage_costs.get(stage, 0.0)
+
+    def record(self, stage, seconds):
+        """Registra la duración de una etapa y la descuenta del presupuesto"""
+        previous = self.stage_costs.get(stage)
+        if previous is None:
+            self.stage_costs[stage] = seconds
+        else:
+            self.stage_costs[stage] = previous + self.smoothing * (seconds - previous)
+        if self.cpu_budget:
+            self._tokens -= seconds
+
+    def _refill(self, now):
+        if not self.cpu_budget:
+            return
+        # El saldo acumulado se limita para no permitir ráfagas largas
+        capacity = max(0.05, 2 * (self.cost('detect') + self.cost('display')))
+        self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.cpu_budget)
+        self._last_refill = now
+
+    def should_detect(self, now=None):
+        """Decide si el frame actual pasa por la detección"""
+        now = time.perf_counter() if now is None else now
+        self._refill(now)
+
+        due = (
+            not self.target_hz
+            or self._last_detect is None
+            or now - self._last_detect >= 1.0 / self.target_hz
+        )
+        affordable = not self.cpu_budget or self._tokens >= self.cost('detect')
+
+        if due and affordable:
+            self._last_detect = now
+            self.detections += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def should_display(self, now=None):
+        """Decide si se refresca la ventana en un frame sin detección"""
+        now = time.perf_counter() if now is None else now
+        since_display = None if self._last_display is None else now - self._last_display
+        if since_display is not None and since_display < 1.0 / self.display_hz:
+            return False
+        if self.cpu_budget and self._tokens < self.cost('display') + self.cost('detect'):
+            # Sin saldo, solo se refresca para no bajar de min_display_hz
+            reserved = self.min_display_hz and (
+                since_display is None or since_display >= 1.0 / self.min_display_hz
+            )
+            if not reserved:
+                self.throttled_displays += 1
+                if self.metrics is not None:
+                    self.metrics.count('display_throttled')
+                return False
+        self._last_display = now
+        return True
+
+    def mark_displayed(self, now=None):
+        """Anota un refresco de ventana hecho junto con una detección"""
+        self._last_display = time.perf_counter() if now is None else now
+
+    def sleep_time(self, now=None):
+        """Tiempo que conviene esperar antes del siguiente frame (segundos)"""
+        if not self.active:
+            return self.MIN_SLEEP
+        now = time.perf_counter() if now is None else now
+        self._refill(now)
+
+        wait = 0.0
+        if self.target_hz and self._last_detect is not None:
+            wait = max(wait, self._last_detect + 1.0 / self.target_hz - now)
+        if self.cpu_budget:
+            deficit = self.cost('detect') - self._tokens
+            if deficit > 0:
+                wait = max(wait, deficit / self.cpu_budget)
+        return min(self.MAX_SLEEP, max(self.MIN_SLEEP, wait))
@@ -0,0 +1,101 @@
+import csv
+import io
+import os
+import threading
+import zlib
+
+
+class SessionLog:
+    """Lector incremental de un CSV al que solo se añaden filas (sessions.csv).
+
+    Recuerda hasta qué byte ha leído y las filas ya parseadas; en cada
+    consulta solo parsea lo añadido desde la anterior. Si el archivo se ha
+    sustituido (otro inodo), truncado, reescrito con el mismo tamaño o su
+    cabecera ya no coincide (checksum), se vuelve a leer entero.
+
+    Args:
+        path (str): ruta del CSV
+        row_factory: función (índice, dict) -> fila guardada; por defecto
+            se guarda el dict tal como lo da csv (valores de texto)
+    """
+
+    def __init__(self, path, row_factory=None):
+        self.path = path
+        self.row_factory = row_factory
+        self._lock = threading.Lock()
+        self._reset()
+        self.full_reloads = 0
+
+    def _reset(self):
+        self._rows = []
+        self._fields = None
+        self._offset = 0
+        self._identity = None
+        self._header = None
+        self._header_crc = None
+        self._mtime = None
+
+    def _header_changed(self, f):
+        f.seek(0)
+        return zlib.crc32(f.read(len(self._header))) != self._header_crc
+
+    def refresh(self):
+        """Incorpora las filas añadidas desde la última lectura"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                self._reset()
+                return
+
+            identity = (stat.st_dev, stat.st_ino)
+            if stat.st_size == self._offset and stat.st_mtime_ns == self._mtime:
+                return
+
+            with open(self.path, 'rb') as f:
+                rewritten = (
+                    identity != self._identity
+                    or stat.st_size < self._offset
+                    # Mismo tamaño pero otro mtime: se editó sin añadir nada
+                    or stat.st_size == self._offset
+                    or (self._header is not None and self._header_changed(f))
+                )
+                if rewritten:
+                    self._reset()
+                    self.full_reloads += 1
+                self._identity = identity
+                self._mtime = stat.st_mtime_ns
+                f.seek(self._offset)
+                self._consume(f.read(stat.st_size - self._offset))
+
+    def _consume(self, chunk):
+        # Solo líneas completas: una fila a medias se lee en la siguiente llamada
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return
+        if self._header is None:
+            header_end = chunk.find(b'\n') + 1
+            self._header = chunk[:header_end]
+            self._header_crc = zlib.crc32(self._header)
+            self._fields = next(csv.reader([self._header.decode('utf-8-sig')]), [])
+            self._offset += header_end
+            chunk = chunk[header_end:]
+            end -= header_end
+
+        text = chunk[:end].decode('utf-8', errors='replace')
+        for values in csv.reader(io.StringIO(text)):
+            if not values:
+                continue
+            row = dict(zip(self._fields, values))
+            if self.row_factory is not None:
+                row = self.row_factory(len(self._rows), row)
+            self._rows.append(row)
+        self._offset += end
+
+    def rows(self):
+        """Todas las filas, al día (lista compartida: no modificarla)"""
+        self.refresh()
+        return self._rows
+
+    def __len__(self):
+        return len(self.rows())
@@ -0,0 +1,26 @@
+import json
+import os
+
+
+CONFIG_FILE = "config.json"
+
+
+def load_settings(section, defaults, config_file=CONFIG_FILE):
+    """Lee una sección de config.json (generado por utils/config_tool.py).
+
+    Las claves que falten en el archivo toman el valor por defecto, así un
+    config.json antiguo sigue funcionando.
+    """
+    settings = dict(defaults)
+    if not os.path.exists(config_file):
+        return settings
+
+    try:
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️  No se pudo leer {config_file}, usando valores por defecto")
+        return settings
+
+    settings.update(config.get(section) or {})
+    return settings
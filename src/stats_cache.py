@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from src.file_lock import locked
+from src.storage import empty_game_stats, game_key
+
+
+# Sumas acumuladas por juego: las medias se derivan al consultar
+SUM_FIELDS = {
+    'total_sessions': None,
+    'total_time': 'duration_seconds',
+    'total_happy': 'happy_count',
+    'total_angry': 'angry_count',
+    'total_neutral': 'neutral_count',
+    'sum_rage_percentage': 'angry_percentage',
+    'sum_happy_percentage': 'happy_percentage',
+    'total_peak_rages': 'peak_rage_count',
+    'total_happy_streaks': 'happiness_streaks',
+}
+
+
+def _as_number(value, cast):
+    try:
+        return cast(value or 0)
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+class GameStatsCache:
+    """Agregados por juego mantenidos de forma incremental.
+
+    Se guardan en un archivo JSON junto a los datos, con la huella del
+    almacenamiento (tamaño y mtime) del momento en que se calcularon. Si la
+    huella ya no coincide (alguien editó los datos por fuera) se reconstruyen
+    con una pasada completa; si coincide, consultar cuesta lo mismo tenga el
+    historial diez sesiones o cien mil, y guardar una sesión solo suma sus
+    valores al juego correspondiente.
+
+    El archivo se comparte entre procesos (tracker y dashboard): si la huella
+    no coincide primero se relee por si otro proceso ya lo actualizó, y solo
+    se reconstruye si sigue desfasado. Guardar una sesión y reconstruir se
+    hacen con el bloqueo de archivo de locked().
+    """
+
+    VERSION = 2
+
+    def __init__(self, backend, path):
+        self.backend = backend
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._games = None
+        self._stamp = None
+        self._file_stamp = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    @contextmanager
+    def locked(self):
+        """Bloqueo exclusivo entre hilos y procesos (no reentrante)"""
+        with self._lock:
+            directory = os.path.dirname(self.lock_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            with open(self.lock_path, 'a+b') as f:
+                with locked(f):
+                    yield
+
+    def _sidecar_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _load(self):
+        """Lee el archivo de agregados si cambió y corresponde a este backend"""
+        file_stamp = self._sidecar_stamp()
+        if file_stamp is None or file_stamp == self._file_stamp:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._file_stamp = file_stamp
+        if data.get('version') == self.VERSION and data.get('backend') == self.backend.name:
+            self._games = data.get('games', {})
+            self._stamp = data.get('stamp')
+
+    def _persist(self):
+        # Escritura atómica con un temporal propio de cada proceso e hilo:
+        # dos escritores nunca comparten el archivo temporal
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.VERSION,
+                'backend': self.backend.name,
+                'stamp': self._stamp,
+                'games': self._games,
+            }, f)
+        os.replace(tmp_path, self.path)
+        self._file_stamp = self._sidecar_stamp()
+
+    def _rebuild(self):
+        # La huella se toma antes de leer: una sesión añadida durante la
+        # lectura deja los agregados desfasados (y se recalculan), nunca
+        # contada en la huella sin estar en las sumas
+        stamp = self.backend.stamp()
+        games = {}
+        for row in self.backend.iter_sessions():
+            self._add(games, row)
+        self._games = games
+        self._stamp = stamp
+        self.rebuilds += 1
+        self._persist()
+
+    @staticmethod
+    def _add(games, row):
+        key = game_key(row.get('game', ''))
+        accumulate(games, key, row)
+        # Nombre tal como aparece en la primera sesión, para mostrarlo
+        games[key].setdefault('game', row.get('game', ''))
+
+    def is_fresh(self):
+        """True si los agregados corresponden al estado actual de los datos"""
+        stamp = self.backend.stamp()
+        if self._games is None or self._stamp != stamp:
+            # Otro proceso pudo guardar una sesión y actualizar el archivo
+            self._load()
+        return self._games is not None and self._stamp == stamp
+
+    def _ensure_fresh(self):
+        if self.is_fresh():
+            return
+        with self.locked():
+            # Con el bloqueo tomado: otro hilo o proceso pudo ponerlos al día
+            if not self.is_fresh():
+                self._rebuild()
+
+    def session_added(self, session_data, was_fresh):
+        """Suma una sesión recién guardada a su juego.
+
+        Args:
+            session_data (dict): sesión tal como se guardó
+            was_fresh (bool): is_fresh() justo antes de guardarla; si no lo
+                estaba, la próxima consulta reconstruye los agregados.
+                Comprobación, guardado y esta llamada van dentro de locked().
+        """
+        if not was_fresh:
+            return
+        self._add(self._games, session_data)
+        self._stamp = self.backend.stamp()
+        self._persist()
+
+    def sums(self):
+        """Sumas por clave de juego (dict de dicts, sin copiar)"""
+        self._ensure_fresh()
+        return self._games
+
+    def stats(self, game_name):
+        """Estadísticas de un juego con el formato de get_game_stats"""
+        entry = self.sums().get(game_key(game_name))
+        if entry is None:
+            return empty_game_stats()
+        return finalize_stats(entry)
+
+
+def accumulate(groups, key, row):
+    """Suma una sesión (fila del CSV o dict de sesión) al grupo `key`"""
+    entry = groups.get(key)
+    if entry is None:
+        entry = groups[key] = dict.fromkeys(SUM_FIELDS, 0)
+    entry['total_sessions'] += 1
+    for name, column in SUM_FIELDS.items():
+        if column is None:
+            continue
+        cast = float if column.endswith('percentage') else int
+        entry[name] += _as_number(row.get(column), cast)
+
+
+def finalize_stats(entry):
+    """Convierte sumas acumuladas en el dict de estadísticas de un juego"""
+    stats = empty_game_stats()
+    for name in stats:
+        if name in entry:
+            stats[name] = entry[name]
+    sessions = entry['total_sessions']
+    if sessions > 0:
+        stats['avg_rage_percentage'] = entry['sum_rage_percentage'] / sessions
+        stats['avg_happy_percentage'] = entry['sum_happy_percentage'] / sessions
+    return stats
@@ -0,0 +1,503 @@
+"""
+RAGE TRACKER - Backends de almacenamiento
+DataManager delega en uno de estos backends la lista de juegos y la tabla de
+sesiones: CSV (por defecto, compatible con las versiones anteriores) o SQLite
+(indexado, para historiales grandes). Los dos exponen la misma interfaz.
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime, timedelta
+
+from src.file_lock import append_locked, csv_line, locked
+from src.games_registry import GAME_FIELDS, GamesRegistry, game_key
+from src.session_log import SessionLog
+
+
+SESSION_FIELDS = [
+    'game', 'date', 'duration_seconds',
+    'happy_count', 'angry_count', 'neutral_count',
+    'happy_percentage', 'angry_percentage', 'neutral_percentage',
+    'peak_rage_count', 'happiness_streaks', 'emotional_trend',
+    'total_frames', 'player'
+]
+
+
+def session_row(session_data):
+    """Valores de una sesión en el orden de SESSION_FIELDS"""
+    return [
+        session_data['game'],
+        session_data['date'],
+        session_data['duration_seconds'],
+        session_data['happy_count'],
+        session_data['angry_count'],
+        session_data['neutral_count'],
+        session_data.get('happy_percentage', 0),
+        session_data.get('angry_percentage', 0),
+        session_data.get('neutral_percentage', 0),
+        session_data.get('peak_rage_count', 0),
+        session_data.get('happiness_streaks', 0),
+        session_data.get('emotional_trend', 'neutral'),
+        session_data.get('total_frames', 0),
+        # Solo en modo sofá ("Jugador 2"); vacío en las sesiones de un jugador
+        session_data.get('player', '')
+    ]
+
+
+def date_bounds(date_from=None, date_to=None):
+    """Límites [desde, hasta) como texto comparable con la columna date.
+
+    Ambos extremos son días incluidos ("YYYY-MM-DD", date o datetime); el
+    superior se convierte en el día siguiente para que una comparación de
+    texto con "YYYY-MM-DD HH:MM:SS" funcione (y use el índice en SQLite).
+    """
+    def as_day(value):
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+    lower = as_day(date_from).isoformat() if date_from else None
+    upper = (as_day(date_to) + timedelta(days=1)).isoformat() if date_to else None
+    return lower, upper
+
+
+def empty_game_stats():
+    """Estadísticas de un juego sin sesiones"""
+    return {
+        'total_sessions': 0,
+        'total_time': 0,
+        'total_happy': 0,
+        'total_angry': 0,
+        'total_neutral': 0,
+        'avg_rage_percentage': 0,
+        'avg_happy_percentage': 0,
+        'total_peak_rages': 0,
+        'total_happy_streaks': 0
+    }
+
+
+class CsvBackend:
+    """Almacenamiento original: data/games.csv y data/sessions.csv"""
+
+    name = "csv"
+
+    def __init__(self, data_dir="data"):
+        self.data_dir = data_dir
+        self.games_file = os.path.join(data_dir, "games.csv")
+        self.sessions_file = os.path.join(data_dir, "sessions.csv")
+        self._initialize_files()
+        self.games = GamesRegistry(self.games_file)
+        # Lector incremental: solo parsea lo añadido desde la última consulta
+        self.sessions = SessionLog(self.sessions_file)
+
+    def _initialize_files(self):
+        """Crea el directorio data y los archivos CSV si no existen"""
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+
+        if not os.path.exists(self.games_file):
+            with open(self.games_file, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(GAME_FIELDS)
+
+        if not os.path.exists(self.sessions_file):
+            with open(self.sessions_file, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(SESSION_FIELDS)
+        else:
+            self._upgrade_sessions_header()
+
+    def _upgrade_sessions_header(self):
+        """Añade a la cabecera de un sessions.csv antiguo las columnas nuevas.
+
+        Las filas antiguas no se tocan: les faltan los últimos valores y se
+        leen como vacíos. Se reescribe en el mismo archivo y con el bloqueo
+        de las escrituras, para que nadie añada una fila a mitad.
+        """
+        with open(self.sessions_file, 'r+b') as f:
+            with locked(f):
+                f.seek(0)
+                header = f.readline()
+                fields = next(csv.reader([header.decode('utf-8-sig')]), [])
+                if not fields or fields == SESSION_FIELDS or fields != SESSION_FIELDS[:len(fields)]:
+                    return
+                rest = f.read()
+                f.seek(0)
+                f.write(csv_line(SESSION_FIELDS) + rest)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+
+    @property
+    def source(self):
+        """Archivo del que salen las sesiones (identifica el origen de las copias)"""
+        return os.path.abspath(self.sessions_file)
+
+    def stamp(self):
+        """Tamaño y mtime de sessions.csv: cambian con cualquier escritura"""
+        try:
+            stat = os.stat(self.sessions_file)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def add_game(self, game_name, genre="", notes=""):
+        return self.games.add(game_name, genre, notes)
+
+    def game_exists(self, game_name):
+        return self.games.exists(game_name)
+
+    def get_games(self):
+        return self.games.names()
+
+    def get_game_records(self):
+        """Juegos completos (nombre, fecha, género, notas) como dicts"""
+        return self.games.records()
+
+    def get_game_record(self, game_name):
+        return self.games.get(game_name)
+
+    def iter_sessions(self, date_from=None, date_to=None):
+        """Recorre las sesiones en orden (filas de texto, como csv.DictReader)"""
+        lower, upper = date_bounds(date_from, date_to)
+        for row in self.sessions.rows():
+            row_date = row.get('date') or ''
+            if lower and row_date < lower:
+                continue
+            if upper and row_date >= upper:
+                continue
+            yield row
+
+    def read_sessions(self, start=0):
+        """Sesiones desde la posición `start` (0 = todas)"""
+        return self.sessions.rows()[start:]
+
+    def count_sessions(self):
+        return len(self.sessions)
+
+    def page_sessions(self, limit, before=None, game_name=None, date_from=None, date_to=None):
+        """Hasta `limit` sesiones (id, fila), de la más reciente a la más antigua.
+
+        Solo sesiones con id menor que `before` (None = desde la última); se
+        recorren las filas hacia atrás hasta completar la página.
+        """
+        lower, upper = date_bounds(date_from, date_to)
+        key = game_key(game_name) if game_name is not None else None
+        rows = self.sessions.rows()
+        start = len(rows) if before is None else max(0, min(before, len(rows)))
+        page = []
+        for session_id in range(start - 1, -1, -1):
+            if len(page) == limit:
+                break
+            row = rows[session_id]
+            row_date = row.get('date') or ''
+            if key is not None and game_key(row.get('game', '')) != key:
+                continue
+            if lower and row_date < lower:
+                continue
+            if upper and row_date >= upper:
+                continue
+            page.append((session_id, row))
+        return page
+
+    def append_session(self, session_data):
+        """Añade una sesión y devuelve su id (posición en sessions.csv)"""
+        session_id = self.count_sessions()
+        append_locked(self.sessions_file, csv_line(session_row(session_data)))
+        return session_id
+
+    def get_all_sessions(self, game_name=None):
+        if game_name is None:
+            return list(self.sessions.rows())
+        key = game_key(game_name)
+        return [row for row in self.sessions.rows() if game_key(row.get('game', '')) == key]
+
+
+class SqliteBackend:
+    """Juegos y sesiones en una base SQLite en modo WAL.
+
+    Los nombres se guardan también normalizados con casefold() en una
+    columna indexada, así que buscar un juego o sus sesiones es una
+    consulta por índice en lugar de recorrer todo el historial. El id de
+    cada sesión coincide con su posición en sessions.csv (empezando en 0),
+    de modo que las métricas y timelines guardados siguen enlazados tras
+    migrar.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS games (
+            game_name TEXT NOT NULL,
+            game_key TEXT NOT NULL,
+            date_added TEXT,
+            genre TEXT,
+            notes TEXT
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_games_key ON games(game_key);
+
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY,
+            game TEXT NOT NULL,
+            game_key TEXT NOT NULL,
+            date TEXT,
+            duration_seconds INTEGER DEFAULT 0,
+            happy_count INTEGER DEFAULT 0,
+            angry_count INTEGER DEFAULT 0,
+            neutral_count INTEGER DEFAULT 0,
+            happy_percentage REAL DEFAULT 0,
+            angry_percentage REAL DEFAULT 0,
+            neutral_percentage REAL DEFAULT 0,
+            peak_rage_count INTEGER DEFAULT 0,
+            happiness_streaks INTEGER DEFAULT 0,
+            emotional_trend TEXT DEFAULT 'neutral',
+            total_frames INTEGER DEFAULT 0,
+            player TEXT DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_game_key ON sessions(game_key);
+        CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+    """
+
+    def __init__(self, path="data/rage_tracker.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # Una conexión por hilo (el servidor del dashboard atiende en varios)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+            # Bases creadas antes de existir la columna del jugador (modo sofá)
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(sessions)")]
+            if 'player' not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN player TEXT DEFAULT ''")
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @property
+    def source(self):
+        """Archivo del que salen las sesiones (identifica el origen de las copias)"""
+        return os.path.abspath(self.path)
+
+    def stamp(self):
+        """Tamaño y mtime de la base y de su WAL: cambian con cualquier escritura"""
+        stamp = []
+        for path in (self.path, self.path + "-wal"):
+            try:
+                stat = os.stat(path)
+                stamp.extend([stat.st_size, stat.st_mtime_ns])
+            except OSError:
+                stamp.extend([0, 0])
+        return stamp
+
+    def add_game(self, game_name, genre="", notes=""):
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO games (game_name, game_key, date_added, genre, notes) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (game_name, game_key(game_name),
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"), genre, notes)
+            )
+        return cursor.rowcount == 1
+
+    def game_exists(self, game_name):
+        row = self._connection().execute(
+            "SELECT 1 FROM games WHERE game_key = ?", (game_key(game_name),)
+        ).fetchone()
+        return row is not None
+
+    def get_games(self):
+        rows = self._connection().execute("SELECT game_name FROM games ORDER BY rowid")
+        return [row['game_name'] for row in rows]
+
+    def get_game_records(self):
+        rows = self._connection().execute(
+            "SELECT game_name, date_added, genre, notes FROM games ORDER BY rowid"
+        )
+        return [dict(row) for row in rows]
+
+    def get_game_record(self, game_name):
+        row = self._connection().execute(
+            "SELECT game_name, date_added, genre, notes FROM games WHERE game_key = ?",
+            (game_key(game_name),)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def iter_sessions(self, date_from=None, date_to=None):
+        lower, upper = date_bounds(date_from, date_to)
+        conditions, params = [], []
+        if lower:
+            conditions.append("date >= ?")
+            params.append(lower)
+        if upper:
+            conditions.append("date < ?")
+            params.append(upper)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection().execute(
+            f"SELECT {', '.join(SESSION_FIELDS)} FROM sessions {where} ORDER BY id", params
+        )
+        for row in rows:
+            yield dict(row)
+
+    def read_sessions(self, start=0):
+        rows = self._connection().execute(
+            f"SELECT {', '.join(SESSION_FIELDS)} FROM sessions ORDER BY id LIMIT -1 OFFSET ?", (start,)
+        )
+        return [dict(row) for row in rows]
+
+    def count_sessions(self):
+        row = self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return row[0]
+
+    def page_sessions(self, limit, before=None, game_name=None, date_from=None, date_to=None):
+        """Hasta `limit` sesiones (id, fila), de la más reciente a la más antigua"""
+        lower, upper = date_bounds(date_from, date_to)
+        conditions, params = [], []
+        if before is not None:
+            conditions.append("id < ?")
+            params.append(before)
+        if game_name is not None:
+            conditions.append("game_key = ?")
+            params.append(game_key(game_name))
+        if lower:
+            conditions.append("date >= ?")
+            params.append(lower)
+        if upper:
+            conditions.append("date < ?")
+            params.append(upper)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection().execute(
+            f"SELECT id, {', '.join(SESSION_FIELDS)} FROM sessions {where} ORDER BY id DESC LIMIT ?",
+            params + [limit]
+        )
+        page = []
+        for row in rows:
+            row = dict(row)
+            page.append((row.pop('id'), row))
+        return page
+
+    def append_session(self, session_data):
+        """Añade una sesión y devuelve su id"""
+        values = session_row(session_data)
+        columns = ', '.join(['id', 'game_key'] + SESSION_FIELDS)
+        placeholders = ', '.join('?' * (len(SESSION_FIELDS) + 2))
+        with self._connection() as conn:
+            session_id = conn.execute(
+                "SELECT COALESCE(MAX(id) + 1, 0) FROM sessions"
+            ).fetchone()[0]
+            conn.execute(
+                f"INSERT INTO sessions ({columns}) VALUES ({placeholders})",
+                [session_id, game_key(session_data['game'])] + values
+            )
+        return session_id
+
+    def get_all_sessions(self, game_name=None):
+        columns = ', '.join(SESSION_FIELDS)
+        if game_name is None:
+            rows = self._connection().execute(
+                f"SELECT {columns} FROM sessions ORDER BY id"
+            )
+        else:
+            rows = self._connection().execute(
+                f"SELECT {columns} FROM sessions WHERE game_key = ? ORDER BY id",
+                (game_key(game_name),)
+            )
+        return [dict(row) for row in rows]
+
+
+def migrate_csv_to_sqlite(data_dir="data", db_path="data/rage_tracker.db", force=False):
+    """Copia games.csv y sessions.csv a una base SQLite (una sola vez).
+
+    Las sesiones conservan su orden, así que su id en SQLite es el mismo que
+    su posición en el CSV. Si la base ya tiene datos no se toca, salvo con
+    force=True, que la vacía antes de copiar.
+
+    Returns:
+        tuple: (juegos copiados, sesiones copiadas)
+    """
+    source = CsvBackend(data_dir)
+    target = SqliteBackend(db_path)
+    conn = target._connection()
+
+    existing = conn.execute("SELECT (SELECT COUNT(*) FROM games) + (SELECT COUNT(*) FROM sessions)").fetchone()[0]
+    if existing and not force:
+        raise ValueError(f"{db_path} ya contiene datos (usa --force para sobrescribir)")
+
+    with open(source.games_file, 'r', encoding='utf-8') as f:
+        games = [
+            (row['game_name'], game_key(row['game_name']), row.get('date_added', ''),
+             row.get('genre', ''), row.get('notes', ''))
+            for row in csv.DictReader(f) if row.get('game_name')
+        ]
+
+    columns = ', '.join(['id', 'game_key'] + SESSION_FIELDS)
+    placeholders = ', '.join('?' * (len(SESSION_FIELDS) + 2))
+    with open(source.sessions_file, 'r', encoding='utf-8') as f:
+        sessions = [
+            [session_id, game_key(row.get('game', ''))] + [row.get(field) for field in SESSION_FIELDS]
+            for session_id, row in enumerate(csv.DictReader(f, restval=''))
+        ]
+
+    with conn:
+        if force:
+            conn.execute("DELETE FROM games")
+            conn.execute("DELETE FROM sessions")
+        conn.executemany(
+            "INSERT OR IGNORE INTO games (game_name, game_key, date_added, genre, notes) "
+            "VALUES (?, ?, ?, ?, ?)",
+            games
+        )
+        conn.executemany(f"INSERT INTO sessions ({columns}) VALUES ({placeholders})", sessions)
+
+    target.close()
+    return len(games), len(sessions)
+
+
+def open_backend(settings, data_dir="data"):
+    """Crea el backend indicado en la sección "storage" de config.json"""
+    backend = settings.get('backend', 'csv')
+    if backend == 'sqlite':
+        return SqliteBackend(settings.get('database') or os.path.join(data_dir, "rage_tracker.db"))
+    if backend != 'csv':
+        print(f"⚠️  Backend de almacenamiento desconocido '{backend}', usando CSV")
+    return CsvBackend(data_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra los datos CSV de Rage Tracker a SQLite")
+    parser.add_argument("--data-dir", default="data", help="Directorio con games.csv y sessions.csv")
+    parser.add_argument("--database", default=None, help="Ruta de la base SQLite de destino")
+    parser.add_argument("--force", action="store_true", help="Vaciar la base si ya tiene datos")
+    args = parser.parse_args()
+
+    database = args.database or os.path.join(args.data_dir, "rage_tracker.db")
+    try:
+        games, sessions = migrate_csv_to_sqlite(args.data_dir, database, args.force)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"✅ Migrados {games} juegos y {sessions} sesiones a {database}")
+    print('   Activa el backend en config.json: "storage": {"backend": "sqlite"}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import csv
+import os
+
+import numpy as np
+
+from src.emotion_history import EMOTION_CODES, RECORD_DTYPE
+from src.file_lock import append_locked, csv_line, locked
+
+
+class TimelineStore:
+    """Almacén persistente de timelines de sesión.
+
+    Todos los registros (RECORD_DTYPE, 10 bytes) se añaden a un único archivo
+    binario `timelines.bin` que se lee con memmap; `index.csv` guarda para
+    cada sesión el primer registro y cuántos tiene. Leer el timeline de una
+    sesión solo toca su tramo del archivo.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.data_file = os.path.join(directory, "timelines.bin")
+        self.index_file = os.path.join(directory, "index.csv")
+        self._index = {}
+        self._index_stamp = None
+
+    def save(self, session_id, timeline):
+        """Guarda el timeline de una sesión.
+
+        Args:
+            session_id (int): id de la sesión en sessions.csv
+            timeline: EmotionHistory o array de RECORD_DTYPE
+        """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        blocks = timeline.iter_blocks() if hasattr(timeline, 'iter_blocks') else [timeline]
+
+        # Todo bajo el bloqueo de timelines.bin: dos procesos que guardan a la
+        # vez no calculan el mismo offset ni cruzan sus líneas del índice
+        with open(self.data_file, 'a+b') as f:
+            with locked(f):
+                size = f.seek(0, os.SEEK_END)
+                # Un registro a medias (corte durante una escritura) se descarta
+                whole = size - size % RECORD_DTYPE.itemsize
+                if whole != size:
+                    f.truncate(whole)
+                offset = whole // RECORD_DTYPE.itemsize
+                count = 0
+                for block in blocks:
+                    data = np.asarray(block, dtype=RECORD_DTYPE)
+                    f.write(data.tobytes())
+                    count += len(data)
+                f.flush()
+
+                entry = csv_line([session_id, offset, count])
+                if not os.path.exists(self.index_file):
+                    entry = csv_line(['session_id', 'offset', 'count']) + entry
+                append_locked(self.index_file, entry)
+        return count
+
+    def _load_index(self):
+        """Índice session_id -> (offset, count), recargado solo si cambia el archivo"""
+        if not os.path.exists(self.index_file):
+            return {}
+        stat = os.stat(self.index_file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._index_stamp:
+            index = {}
+            with open(self.index_file, 'r', encoding='utf-8', newline='') as f:
+                content = f.read()
+            # Una línea sin terminar es de un save() que aún está escribiendo
+            lines = content[:content.rfind('\n') + 1].splitlines()
+            for row in csv.DictReader(lines):
+                try:
+                    index[int(row['session_id'])] = (int(row['offset']), int(row['count']))
+                except (TypeError, ValueError):
+                    # Línea cortada por una interrupción: esa sesión queda sin timeline
+                    continue
+            self._index = index
+            self._index_stamp = stamp
+        return self._index
+
+    def has_timeline(self, session_id):
+        return session_id in self._load_index()
+
+    def read(self, session_id):
+        """Registros de una sesión (vista memmap) o None si no tiene timeline"""
+        entry = self._load_index().get(session_id)
+        if entry is None:
+            return None
+        offset, count = entry
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        # Solo registros completos: otro proceso puede estar a mitad de añadir
+        rows = os.path.getsize(self.data_file) // RECORD_DTYPE.itemsize
+        if offset + count > rows:
+            return None
+        records = np.memmap(self.data_file, dtype=RECORD_DTYPE, mode='r', shape=(rows,))
+        return records[offset:offset + count]
+
+    def downsample(self, session_id, points=200):
+        """Vista reducida del timeline en `points` tramos como máximo.
+
+        Para cada tramo devuelve el tiempo medio, el porcentaje de enfado y
+        de felicidad y la confianza media, como columnas (listas).
+
+        Returns:
+            dict o None si la sesión no tiene timeline
+        """
+        records = self.read(session_id)
+        if records is None:
+            return None
+
+        total = len(records)
+        buckets = max(1, min(int(points), total))
+        result = {
+            'session_id': session_id,
+            'total_points': total,
+            'timestamps': [],
+            'rage': [],
+            'happy': [],
+            'confidence': [],
+        }
+        if total == 0:
+            return result
+
+        # Tramos contiguos de tamaño casi igual; reduceat agrega cada uno de una vez
+        starts = np.linspace(0, total, buckets + 1).astype(np.int64)[:-1]
+        sizes = np.diff(np.append(starts, total))
+        emotions = records['emotion']
+
+        def bucket_mean(values):
+            return np.add.reduceat(values.astype(np.float64), starts) / sizes
+
+        result['timestamps'] = np.round(bucket_mean(records['timestamp']), 2).tolist()
+        result['rage'] = np.round(bucket_mean(emotions == EMOTION_CODES['angry']) * 100, 1).tolist()
+        result['happy'] = np.round(bucket_mean(emotions == EMOTION_CODES['happy']) * 100, 1).tolist()
+        result['confidence'] = np.round(bucket_mean(records['confidence']), 1).tolist()
+        return result
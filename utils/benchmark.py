@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+RAGE TRACKER - Benchmark
+Mide el tiempo de cada etapa del pipeline de detección sin cámara ni ventana
+y guarda el resultado en JSON para comparar entre commits
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Permite ejecutar el script desde la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from src.camera import EmotionDetector
+from src.face_features import FaceFeatures
+from src.frame_source import SyntheticSource, open_source
+
+
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+
+def summarize(samples):
+    """Estadísticas de una lista de duraciones (segundos) en milisegundos"""
+    if not samples:
+        return None
+    values = np.array(samples) * 1000
+    mean = float(values.mean())
+    return {
+        "samples": len(samples),
+        "mean_ms": round(mean, 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "min_ms": round(float(values.min()), 3),
+        "max_ms": round(float(values.max()), 3),
+        "throughput_per_s": round(1000 / mean, 1) if mean > 0 else None,
+    }
+
+
+def timed(samples, stage, fn, *args):
+    """Ejecuta fn(*args) anotando su duración en samples[stage]"""
+    start = time.perf_counter()
+    result = fn(*args)
+    samples.setdefault(stage, []).append(time.perf_counter() - start)
+    return result
+
+
+def default_face(frame):
+    """Caja de cara centrada para medir sonrisa/ojos cuando no se detecta ninguna"""
+    height, width = frame.shape[:2]
+    size = height // 2
+    return (width - size) // 2, (height - size) // 2, size, size
+
+
+def benchmark_source(name, source, max_frames):
+    """Mide todas las etapas sobre los frames de una fuente"""
+    detector = EmotionDetector(f"benchmark-{name}")
+    tracker = detector.face_tracker
+    samples = {}
+    frames = 0
+    faces_found = 0
+    resolution = None
+
+    while frames < max_frames:
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames += 1
+        resolution = f"{frame.shape[1]}x{frame.shape[0]}"
+
+        gray = timed(samples, "cvtColor", cv2.cvtColor, frame, cv2.COLOR_BGR2GRAY)
+        faces = timed(samples, "face_cascade_full", tracker._detect_full, gray)
+        if faces:
+            faces_found += 1
+            tracker.last_face = faces[0]
+            timed(samples, "face_cascade_tracked", tracker._detect_in_window, gray)
+        face = faces[0] if faces else default_face(frame)
+
+        # Sonrisa y ojos medidos por separado (detect_emotion puede saltarse los ojos)
+        x, y, w, h = face
+        features = FaceFeatures(gray[y:y + h, x:x + w], detector.smile_cascade,
+                                detector.eye_cascade, detector.config)
+        timed(samples, "smile_cascade", lambda: features.smiles)
+        timed(samples, "eye_cascade", lambda: features.eyes)
+        emotion, confidence = timed(samples, "detect_emotion", detector.detect_emotion,
+                                    frame, gray, face)
+        timed(samples, "update_emotion_count", detector.update_emotion_count, emotion, confidence)
+
+        overlay_frame = frame.copy()
+        timed(samples, "draw_info", detector.draw_info, overlay_frame, emotion, confidence)
+
+        # Pipeline completo tal como lo ejecuta run()/replay
+        timed(samples, "process_frame", detector.process_frame, frame)
+
+    timed(samples, "session_summary", detector.get_session_summary)
+    source.release()
+
+    return {
+        "source": name,
+        "resolution": resolution,
+        "frames": frames,
+        "face_found_ratio": round(faces_found / frames, 3) if frames else 0,
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+    }
+
+
+def git_revision():
+    """Commit actual (si el proyecto es un repositorio git)"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del detector")
+    parser.add_argument("--frames", type=int, default=60, help="Frames por fuente")
+    parser.add_argument("--resolutions", default="480p,720p,1080p",
+                        help="Resoluciones sintéticas (vacío = ninguna)")
+    parser.add_argument("--source", action="append", default=[],
+                        help="Vídeo o directorio grabado (se puede repetir)")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto, stdout)")
+    args = parser.parse_args()
+
+    results = []
+    for label in filter(None, args.resolutions.split(",")):
+        width, height = RESOLUTIONS[label]
+        print(f"⏱️  Sintético {label}...", file=sys.stderr)
+        results.append(benchmark_source(
+            f"synthetic-{label}", SyntheticSource(width, height, frames=args.frames), args.frames
+        ))
+
+    for spec in args.source:
+        print(f"⏱️  {spec}...", file=sys.stderr)
+        source = open_source(spec)
+        if not source.isOpened():
+            print(f"❌ No se pudo abrir {spec}", file=sys.stderr)
+            continue
+        results.append(benchmark_source(os.path.basename(spec.rstrip("/")), source, args.frames))
+
+    report = {
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"✅ Resultados guardados en {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,6 +36,17 @@ class ConfigTool:
                 "show_confidence": True,
                 "show_debug_info": False,
                 "overlay_opacity": 0.7
+            },
+            "performance": {
+                "target_verdict_hz": None,         # veredictos por segundo (None = cada frame)
+                "cpu_budget": None,                # fracción de un núcleo, p. ej. 0.15
+                "display_hz": 30,                  # refresco máximo de la ventana
+                "min_display_hz": 5,               # refresco garantizado aunque se agote cpu_budget
+                "live_interval": 0.5               # segundos entre estados en vivo (0 = no publicar)
+            },
+            "storage": {
+                "backend": "csv",                  # "csv" o "sqlite" (python -m src.storage para migrar)
+                "database": "data/rage_tracker.db"
             }
         }
         self.load_config()
@@ -184,11 +195,12 @@ class ConfigTool:
             print("\n1. Ajustar umbrales individuales")
             print("2. Configurar detección de ojos")
             print("3. Configurar visualización")
-            print("4. Exportar configuración")
-            print("5. Importar configuración")
-            print("6. Volver")
+            print("4. Configurar rendimiento")
+            print("5. Exportar configuración")
+            print("6. Importar configuración")
+            print("7. Volver")
             
-            choice = input("\nSelecciona una opción (1-6): ").strip()
+            choice = input("\nSelecciona una opción (1-7): ").strip()
             
             if choice == "1":
                 self.adjust_individual_thresholds()
@@ -197,10 +209,12 @@ class ConfigTool:
             elif choice == "3":
                 self.adjust_display_settings()
             elif choice == "4":
-                self.export_config()
+                self.adjust_performance()
             elif choice == "5":
-                self.import_config()
+                self.export_config()
             elif choice == "6":
+                self.import_config()
+            elif choice == "7":
                 break
             else:
                 print("❌ Opción no válida")
@@ -273,6 +287,36 @@ class ConfigTool:
         self.save_config()
         print("\n✅ Configuración de visualización actualizada")
     
+    def adjust_performance(self):
+        """Ajusta el objetivo de rendimiento del detector"""
+        performance = self.config.setdefault('performance', dict(self.default_config['performance']))
+        print("\n⚡ CONFIGURACIÓN DE RENDIMIENTO")
+        print(f"1. Veredictos por segundo: {performance.get('target_verdict_hz') or 'sin límite'}")
+        print(f"2. Presupuesto de CPU: {performance.get('cpu_budget') or 'sin límite'}")
+        print("3. Sin límites (analizar cada frame)")
+        
+        choice = input("\n¿Qué deseas cambiar? (1-3): ").strip()
+        
+        try:
+            if choice == "1":
+                hz = float(input("Veredictos por segundo (1-30): ").strip())
+                performance['target_verdict_hz'] = max(1.0, min(30.0, hz))
+            elif choice == "2":
+                budget = float(input("Porcentaje de un núcleo (5-100): ").strip())
+                performance['cpu_budget'] = max(5.0, min(100.0, budget)) / 100
+            elif choice == "3":
+                performance['target_verdict_hz'] = None
+                performance['cpu_budget'] = None
+            else:
+                print("❌ Opción no válida")
+                return
+        except ValueError:
+            print("❌ Valor inválido")
+            return
+        
+        self.save_config()
+        print("\n✅ Configuración de rendimiento actualizada")
+    
     def export_config(self):
         """Exporta la configuración a un archivo"""
         filename = input("\nNombre del archivo (default: config_backup.json): ").strip()
@@ -4,103 +4,768 @@ RAGE TRACKER - Dashboard Server
 Servidor web simple para visualizar el dashboard con datos reales
 """
 
+import gzip
+import hashlib
 import http.server
 import socketserver
 import json
-import csv
+import mimetypes
 import os
+import re
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import parse_qs, urlparse
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Permite importar los módulos de src/ al ejecutar el servidor como script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_manager import DataManager
+from src.games_registry import game_key
+from src.live_status import LIVE_FILE, STALE_AFTER, read_live_status
+from src.storage import date_bounds, empty_game_stats
+
+
+# Rutas de la API con parámetros
+TIMELINE_ROUTE = re.compile(r'^/api/sessions/(\d+)/timeline/?$')
+GAME_STATS_ROUTE = re.compile(r'^/api/games/([^/]+)/stats/?$')
+
+# Respuestas JSON cacheadas como máximo (una por endpoint y parámetros)
+API_CACHE_SIZE = 256
+
+# Tamaño de página de /api/sessions (por defecto y máximo)
+SESSIONS_PAGE_SIZE = 50
+SESSIONS_PAGE_MAX = 500
+
+# Conexiones atendidas a la vez y segundos que una conexión keep-alive
+# inactiva puede retener a un worker (con el pool lleno se cierra al responder)
+DEFAULT_WORKERS = 16
+KEEP_ALIVE_TIMEOUT = 5
+
+
+# Por debajo de este tamaño comprimir no compensa
+GZIP_MIN_SIZE = 1024
+
+# Archivos estáticos del dashboard: directorio, segundos entre comprobaciones
+# del mtime y rutas que no coinciden con el nombre del archivo
+WEB_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_CHECK_INTERVAL = 1.0
+STATIC_ROUTES = {
+    '/': 'dashboard.html',
+    '/dashboard': 'dashboard.html',
+    '/favicon.ico': 'icono.ico',
+}
+
+# Stream en vivo (/api/live): cada cuánto se mira data/live.json, cada cuánto
+# se manda un comentario para mantener viva la conexión, cuánto dura un
+# stream antes de cerrarlo (el navegador reconecta solo tras LIVE_RETRY_MS),
+# cuántos streams se atienden a la vez y cuánto se espera a un cliente lento
+LIVE_POLL_INTERVAL = 0.5
+LIVE_HEARTBEAT = 15
+LIVE_STREAM_MAX = 300
+LIVE_RETRY_MS = 2000
+LIVE_MAX_CLIENTS = 100
+LIVE_SEND_TIMEOUT = 1.0
+
+
+class CachedResponse:
+    """Cuerpo de respuesta ya generado, con su ETag y su variante gzip.
+
+    Se guarda junto a la huella (`key`) de los archivos de los que sale;
+    mientras la huella no cambie se reutiliza sin volver a generarlo.
+    """
+
+    def __init__(self, key, body, content_type, modified, cache_control='no-cache', compressible=True):
+        self.key = key
+        self.body = body
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.compressible = compressible
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.last_modified = formatdate(modified, usegmt=True)
+        self.modified = int(modified)
+        self._gzipped = None
+
+    @property
+    def gzipped(self):
+        """Cuerpo comprimido (se calcula una vez, la primera vez que se pide)"""
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+def files_key(*paths):
+    """Huella (tamaño, mtime) de varios archivos; None para los que no existen"""
+    key = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            key.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+
+def is_compressible(content_type):
+    """Tipos de texto que gzip reduce (las imágenes ya van comprimidas)"""
+    return (content_type.startswith('text/') or content_type.split(';')[0] in
+            ('application/json', 'application/javascript', 'image/svg+xml',
+             'image/x-icon', 'image/vnd.microsoft.icon'))
+
+
+class StaticAssets:
+    """Archivos de web/ cargados en memoria, con su ETag y su versión gzip.
+
+    Cada archivo se lee y se comprime una sola vez; como mucho cada
+    `check_interval` segundos se mira su mtime y solo se vuelve a cargar si
+    ha cambiado. El resto de peticiones se sirven sin tocar el disco.
+    """
+
+    def __init__(self, directory, check_interval=STATIC_CHECK_INTERVAL):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, name):
+        """CachedResponse del archivo `name`, o None si no existe"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and now - entry[1] < self.check_interval:
+                return entry[0]
+
+            path = os.path.join(self.directory, name)
+            key = files_key(path)
+            if key[0] is None:
+                self._entries.pop(name, None)
+                return None
+            cached = entry[0] if entry is not None else None
+            if cached is None or cached.key != key:
+                cached = self._load(path, key)
+                if cached is None:
+                    return None
+            self._entries[name] = (cached, now)
+            return cached
+
+    def _load(self, path, key):
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/'):
+            content_type += '; charset=utf-8'
+        # El HTML se revalida siempre (ETag); el resto puede reutilizarse un día
+        cache_control = 'no-cache' if content_type.startswith('text/html') else 'public, max-age=86400'
+        cached = CachedResponse(key, body, content_type, key[0][1] / 1e9, cache_control,
+                                compressible=is_compressible(content_type))
+        if cached.compressible and len(body) >= GZIP_MIN_SIZE:
+            cached.gzipped  # Se precomprime al cargar, no en la primera petición
+        self.loads += 1
+        return cached
+
+    def resolve(self, url_path):
+        """Nombre del archivo de web/ que sirve una ruta, o None"""
+        if url_path in STATIC_ROUTES:
+            return STATIC_ROUTES[url_path]
+        name = url_path.lstrip('/')
+        # Solo archivos del propio directorio, y nunca el código del servidor
+        if not name or '/' in name or '\\' in name or name.startswith('.') or name.endswith('.py'):
+            return None
+        return name
+
+
+class LiveBroadcaster:
+    """Retransmite data/live.json a todos los streams SSE desde un solo hilo.
+
+    El worker que atiende /api/live solo envía las cabeceras y registra el
+    socket con `add()`; después queda libre. Este hilo mira el archivo cada
+    LIVE_POLL_INTERVAL segundos y manda cada estado nuevo (o un latido) a
+    todos los clientes a la vez, así que las pantallas conectadas no ocupan
+    workers del pool.
+    """
+
+    def __init__(self, path=LIVE_FILE, max_clients=LIVE_MAX_CLIENTS):
+        self.path = path
+        self.max_clients = max_clients
+        self._clients = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._sent = None
+        self._message = None
+        self._last_write = 0.0
+
+    def _refresh(self):
+        """Relee el estado si cambió el archivo o si el activo caducó; True si es nuevo"""
+        stamp = files_key(self.path)
+        sent = self._sent
+        expired = sent is not None and sent[1] and time.time() - sent[2] > STALE_AFTER
+        if sent is not None and stamp == sent[0] and not expired:
+            return False
+        state = read_live_status(self.path) or {'active': False}
+        body = json.dumps(state, ensure_ascii=False, separators=(',', ':'))
+        self._message = f"event: status\ndata: {body}\n\n".encode('utf-8')
+        self._sent = (stamp, state['active'], state.get('updated_at', 0))
+        return True
+
+    def add(self, sock):
+        """Registra un stream con las cabeceras ya enviadas y le manda el estado actual.
+
+        Returns:
+            bool: False si no hay cupo o el cliente ya se fue (la conexión
+                sigue siendo de quien la atiende, que debe cerrarla)
+        """
+        with self._lock:
+            if self._stopped.is_set() or len(self._clients) >= self.max_clients:
+                return False
+            self._refresh()
+            try:
+                # Un cliente que no lee no puede retener al resto
+                sock.settimeout(LIVE_SEND_TIMEOUT)
+                sock.sendall(self._message)
+            except OSError:
+                return False
+            self._last_write = time.monotonic()
+            self._clients.append((sock, time.monotonic()))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live-broadcast", daemon=True)
+                self._thread.start()
+        return True
+
+    def _run(self):
+        while not self._stopped.wait(LIVE_POLL_INTERVAL):
+            with self._lock:
+                if self._clients:
+                    self._broadcast()
+
+    def _broadcast(self):
+        now = time.monotonic()
+        if self._refresh():
+            data = self._message
+        elif now - self._last_write >= LIVE_HEARTBEAT:
+            # Comentario SSE: mantiene la conexión y detecta clientes que se fueron
+            data = b": ping\n\n"
+        else:
+            data = None
+        if data is not None:
+            self._last_write = now
+
+        clients = []
+        for sock, since in self._clients:
+            if now - since >= LIVE_STREAM_MAX:
+                self._close(sock)
+                continue
+            if data is not None:
+                try:
+                    sock.sendall(data)
+                except OSError:
+                    self._close(sock)
+                    continue
+            clients.append((sock, since))
+        self._clients = clients
+
+    @staticmethod
+    def _close(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+    def stop(self):
+        """Cierra todos los streams (el navegador reconecta cuando vuelva el servidor)"""
+        self._stopped.set()
+        with self._lock:
+            for sock, _ in self._clients:
+                self._close(sock)
+            self._clients = []
+
+
+class PooledHTTPServer(socketserver.TCPServer):
+    """Servidor TCP que atiende cada conexión en un pool acotado de hilos.
+
+    Si todos los workers están ocupados, las conexiones nuevas esperan en
+    la cola del socket en lugar de crear hilos sin límite; mientras el pool
+    está lleno, las respuestas cierran su conexión en vez de dejarla
+    esperando otra petición con el worker ocupado. `drain()` deja de
+    aceptar, cierra la lectura de las conexiones keep-alive inactivas y
+    espera a que terminen las peticiones en curso.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self.draining = False
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._connections = set()
+        self._detached = set()
+        self._connections_lock = threading.Lock()
+        # Streams en vivo: los atiende un solo hilo, fuera del pool
+        self.live = LiveBroadcaster()
+
+    def process_request(self, request, client_address):
+        # Bloquea el bucle de aceptación hasta que haya un worker libre
+        self._slots.acquire()
+        with self._connections_lock:
+            self._connections.add(request)
+        try:
+            self._pool.submit(self._handle, request, client_address)
+        except RuntimeError:
+            # Pool ya cerrado (apagado en curso)
+            self._release(request)
+            self.shutdown_request(request)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except (ConnectionError, TimeoutError):
+            # El cliente cerró (o abandonó) una conexión keep-alive
+            pass
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._connections_lock:
+                detached = request in self._detached
+                self._detached.discard(request)
+            # Una conexión cedida (stream en vivo) la cierra quien la recibió
+            if not detached:
+                self.shutdown_request(request)
+            self._release(request)
+
+    def _release(self, request):
+        with self._connections_lock:
+            self._connections.discard(request)
+        self._slots.release()
+
+    def detach(self, request):
+        """Libera el worker de `request` sin cerrar la conexión"""
+        with self._connections_lock:
+            self._detached.add(request)
+
+    def saturated(self):
+        """True si todos los workers tienen una conexión asignada"""
+        with self._connections_lock:
+            return len(self._connections) >= self.workers
+
+    def drain(self):
+        """Apagado ordenado: termina lo que está en curso y libera el pool"""
+        self.draining = True
+        self.live.stop()
+        with self._connections_lock:
+            connections = list(self._connections)
+        for request in connections:
+            try:
+                # La siguiente lectura de la conexión verá EOF; las
+                # respuestas que se estén escribiendo no se cortan
+                request.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        self._pool.shutdown(wait=True)
+
+
+def session_from_row(session_id, row):
+    """Convierte una fila de sessions.csv en el dict que recibe el dashboard"""
+    return {
+        'id': session_id,
+        'game': row.get('game', ''),
+        'date': row.get('date', ''),
+        'duration_seconds': int(row.get('duration_seconds', 0)),
+        'happy_count': int(row.get('happy_count', 0)),
+        'angry_count': int(row.get('angry_count', 0)),
+        'neutral_count': int(row.get('neutral_count', 0)),
+        'happy_percentage': float(row.get('happy_percentage', 0)),
+        'angry_percentage': float(row.get('angry_percentage', 0)),
+        'neutral_percentage': float(row.get('neutral_percentage', 0)),
+        'peak_rage_count': int(row.get('peak_rage_count', 0)),
+        'happiness_streaks': int(row.get('happiness_streaks', 0)),
+        'emotional_trend': row.get('emotional_trend', 'neutral'),
+        'total_frames': int(row.get('total_frames', 0)),
+        'player': row.get('player') or ''
+    }
 
 
 class RageTrackerHandler(http.server.SimpleHTTPRequestHandler):
     """Handler personalizado para servir el dashboard y la API de datos"""
     
+    # HTTP/1.1: las conexiones se reutilizan (todas las respuestas llevan Content-Length)
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Cabeceras y cuerpo van en escrituras separadas: sin TCP_NODELAY, Nagle y
+    # el ACK retardado añaden ~40 ms a cada respuesta de una conexión reutilizada
+    disable_nagle_algorithm = True
+    
+    # Acceso a juegos, sesiones y agregados (se crea en start_server)
+    data_manager = None
+    # Respuestas de la API por (endpoint, parámetros), válidas mientras no cambien los datos
+    api_cache = {}
+    api_cache_lock = threading.Lock()
+    # Un candado por clave mientras se genera su respuesta
+    api_build_locks = {}
+    # dashboard.html, icono.ico y demás archivos de web/, en memoria
+    static_assets = StaticAssets(WEB_DIR)
+    
     def do_GET(self):
         """Maneja las peticiones GET"""
         parsed_path = urlparse(self.path)
+        timeline_match = TIMELINE_ROUTE.match(parsed_path.path)
+        game_stats_match = GAME_STATS_ROUTE.match(parsed_path.path)
         
         # API endpoint para obtener datos
         if parsed_path.path == '/api/data':
             self.serve_api_data()
+        # Estadísticas precalculadas
+        elif parsed_path.path == '/api/stats/overview':
+            self.serve_stats(('overview',), self.calculate_global_stats)
+        elif parsed_path.path == '/api/stats/games':
+            self.serve_stats(('games',), self.game_summaries)
+        elif parsed_path.path == '/api/stats/series':
+            query = parse_qs(parsed_path.query)
+            params = tuple(query.get(name, [None])[0] or None for name in ('bucket', 'game', 'from', 'to'))
+            bucket = params[0] or 'day'
+            self.serve_stats(('series', bucket) + params[1:],
+                             lambda: self.stats_series(bucket, *params[1:]))
+        elif game_stats_match:
+            game_name = unquote(game_stats_match.group(1))
+            self.serve_stats(('game', game_key(game_name)), lambda: self.game_stats(game_name))
+        # Estado de la sesión en curso (Server-Sent Events)
+        elif parsed_path.path == '/api/live':
+            self.serve_live()
+        # Sesiones paginadas y filtradas
+        elif parsed_path.path in ('/api/sessions', '/api/sessions/'):
+            self.serve_sessions(parse_qs(parsed_path.query))
+        # Timeline reducido de una sesión
+        elif timeline_match:
+            self.serve_session_timeline(int(timeline_match.group(1)), parse_qs(parsed_path.query))
         # Servir el dashboard
         elif parsed_path.path == '/' or parsed_path.path == '/dashboard':
             self.serve_dashboard()
+        # Archivos de web/ desde memoria
+        elif self.serve_static(parsed_path.path):
+            pass
+        elif self.command == 'HEAD':
+            super().do_HEAD()
         else:
             # Servir archivos estáticos normalmente
             super().do_GET()
     
+    def do_HEAD(self):
+        """Mismas rutas que GET; send_body y send_error omiten el cuerpo"""
+        self.do_GET()
+    
+    def end_headers(self):
+        # Durante el apagado, o con todos los workers ocupados, se pide al
+        # cliente que no reutilice la conexión y se libera el worker
+        server = self.server
+        closing = getattr(server, 'draining', False) or (hasattr(server, 'saturated') and server.saturated())
+        if closing and not self.close_connection:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        super().end_headers()
+    
+    def accepts_gzip(self):
+        encodings = self.headers.get('Accept-Encoding', '')
+        return any(part.strip().split(';')[0] == 'gzip' and 'q=0' not in part.replace(' ', '')
+                   for part in encodings.split(','))
+    
+    def is_not_modified(self, cached):
+        """Comprueba If-None-Match / If-Modified-Since contra la respuesta cacheada"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip().replace('-gzip"', '"') for tag in if_none_match.split(',')]
+            return '*' in tags or cached.etag in tags or 'W/' + cached.etag in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return cached.modified <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+    
+    def send_cached(self, cached, headers=None):
+        """Envía una CachedResponse: 304 si el cliente ya la tiene, gzip si la acepta"""
+        headers = dict(headers or {})
+        headers['Cache-Control'] = cached.cache_control
+        headers['Last-Modified'] = cached.last_modified
+        headers['Vary'] = 'Accept-Encoding'
+        
+        use_gzip = cached.compressible and len(cached.body) >= GZIP_MIN_SIZE and self.accepts_gzip()
+        if self.is_not_modified(cached):
+            # La ETag de la variante que tiene el cliente
+            headers['ETag'] = cached.etag[:-1] + '-gzip"' if use_gzip else cached.etag
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        
+        if use_gzip:
+            # La variante comprimida lleva su propia ETag
+            headers['ETag'] = cached.etag[:-1] + '-gzip"'
+            headers['Content-Encoding'] = 'gzip'
+            self.send_body(cached.gzipped, cached.content_type, headers=headers)
+        else:
+            headers['ETag'] = cached.etag
+            self.send_body(cached.body, cached.content_type, headers=headers)
+    
+    def send_body(self, body, content_type, status=200, headers=None):
+        """Envía una respuesta completa con su Content-Length"""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+    
     def serve_dashboard(self):
         """Sirve el archivo dashboard.html"""
-        try:
-            with open('web/dashboard.html', 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-            self.wfile.write(content.encode('utf-8'))
-        except FileNotFoundError:
+        if not self.serve_static('/dashboard'):
             self.send_error(404, "Dashboard not found")
     
+    def serve_static(self, url_path):
+        """Sirve un archivo de web/ desde memoria. Devuelve False si no existe."""
+        name = self.static_assets.resolve(url_path)
+        cached = self.static_assets.get(name) if name else None
+        if cached is None:
+            return False
+        self.send_cached(cached)
+        return True
+    
+    def data_files_key(self):
+        """Huella de los archivos de datos: si no cambia, los datos tampoco"""
+        data_dir = "data"
+        paths = [os.path.join(data_dir, "games.csv"), os.path.join(data_dir, "sessions.csv")]
+        db_path = getattr(self.data_manager.backend, 'path', None)
+        if db_path:
+            paths += [db_path, db_path + "-wal"]
+        return files_key(*paths)
+    
+    def serve_cached_json(self, cache_key, build):
+        """Sirve el JSON de build(), regenerándolo solo si cambian los datos.
+        
+        El resto de peticiones cuestan un stat (y un 304 si el navegador ya
+        tiene la versión actual). build() puede devolver None para un 404.
+        El candado de la caché solo protege consultas y escrituras: build()
+        corre fuera, con un candado por clave, así que regenerar un endpoint
+        no hace esperar a las peticiones de los demás.
+        """
+        key = self.data_files_key()
+        with self.api_cache_lock:
+            cached = self.api_cache.get(cache_key)
+            build_lock = self.api_build_locks.setdefault(cache_key, threading.Lock())
+        
+        if cached is None or cached.key != key:
+            with build_lock:
+                # Otra petición pudo regenerarlo mientras se esperaba
+                with self.api_cache_lock:
+                    cached = self.api_cache.get(cache_key)
+                if cached is None or cached.key != key:
+                    data = build()
+                    if data is None:
+                        cached = None
+                    else:
+                        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                        modified = max((entry[1] / 1e9 for entry in key if entry), default=0)
+                        cached = CachedResponse(key, body, 'application/json', modified)
+                        with self.api_cache_lock:
+                            if len(self.api_cache) >= API_CACHE_SIZE:
+                                self.api_cache.clear()
+                                self.api_build_locks.clear()
+                            self.api_cache[cache_key] = cached
+        
+        if cached is None:
+            self.send_error(404, "Not found")
+            return
+        self.send_cached(cached, headers={'Access-Control-Allow-Origin': '*'})
+    
     def serve_api_data(self):
         """Sirve los datos en formato JSON desde los archivos CSV"""
         try:
-            data = self.load_data_from_csv()
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            json_data = json.dumps(data, ensure_ascii=False, indent=2)
-            self.wfile.write(json_data.encode('utf-8'))
+            self.serve_cached_json(('data',), self.load_data_from_csv)
         except Exception as e:
             self.send_error(500, f"Error loading data: {str(e)}")
     
+    def serve_stats(self, endpoint, build):
+        """Sirve un endpoint de estadísticas precalculadas"""
+        try:
+            self.serve_cached_json(endpoint, build)
+        except ValueError as e:
+            self.send_error(400, str(e))
+        except Exception as e:
+            self.send_error(500, f"Error computing stats: {str(e)}")
+    
+    def game_summaries(self):
+        """Totales por juego para la pestaña Games y el análisis de rage"""
+        genres = {game_key(r['game_name']): r.get('genre', '') for r in self.data_manager.get_game_records()}
+        game_stats = self.data_manager.aggregate('game')
+        games = []
+        for name in self.data_manager.get_games():
+            stats = game_stats.get(name, empty_game_stats())
+            games.append(self.summarize_game(name, genres.get(game_key(name), ''), stats))
+        # Juegos con sesiones pero sin registrar
+        registered = set(genres)
+        for name, stats in game_stats.items():
+            if game_key(name) not in registered:
+                games.append(self.summarize_game(name, '', stats))
+        return games
+    
+    @staticmethod
+    def summarize_game(name, genre, stats):
+        total_emotions = stats['total_angry'] + stats['total_happy'] + stats['total_neutral']
+        return {
+            'name': name,
+            'genre': genre,
+            'sessions': stats['total_sessions'],
+            'playtime': stats['total_time'],
+            'angry': stats['total_angry'],
+            'happy': stats['total_happy'],
+            'neutral': stats['total_neutral'],
+            'rage_index': round(stats['total_angry'] / total_emotions * 100, 1) if total_emotions else 0,
+            'avg_rage_percentage': round(stats['avg_rage_percentage'], 1),
+            'avg_happy_percentage': round(stats['avg_happy_percentage'], 1),
+        }
+    
+    def game_stats(self, game_name):
+        """Estadísticas de un juego, o None si no existe ni tiene sesiones"""
+        record = self.data_manager.get_game_record(game_name)
+        stats = self.data_manager.get_game_stats(game_name)
+        if record is None and stats['total_sessions'] == 0:
+            return None
+        name = record['game_name'] if record else game_name
+        summary = self.summarize_game(name, record.get('genre', '') if record else '', stats)
+        summary['peak_rages'] = stats['total_peak_rages']
+        summary['happy_streaks'] = stats['total_happy_streaks']
+        return summary
+    
+    def stats_series(self, bucket, game, date_from, date_to):
+        """Serie de rage/happy medio por día o semana"""
+        if bucket not in ('day', 'week'):
+            raise ValueError("bucket must be 'day' or 'week'")
+        groups = self.data_manager.aggregate(bucket, date_from, date_to, game_name=game)
+        labels = sorted(groups)
+        return {
+            'bucket': bucket,
+            'labels': labels,
+            'sessions': [groups[label]['total_sessions'] for label in labels],
+            'rage': [round(groups[label]['avg_rage_percentage'], 1) for label in labels],
+            'happy': [round(groups[label]['avg_happy_percentage'], 1) for label in labels],
+            'playtime': [groups[label]['total_time'] for label in labels],
+        }
+    
+    def send_json(self, data, status=200):
+        """Envía una respuesta JSON"""
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_body(body, 'application/json', status,
+                       headers={'Access-Control-Allow-Origin': '*'})
+    
+    def serve_live(self):
+        """Retransmite data/live.json como Server-Sent Events.
+        
+        Aquí solo se envían las cabeceras; el socket pasa a LiveBroadcaster,
+        que manda un evento `status` al conectar y cada vez que el tracker
+        publica un estado nuevo (o deja de publicarlo). Un stream dura como
+        mucho LIVE_STREAM_MAX segundos y termina al apagar el servidor. Sin
+        cupo, la respuesta es solo `retry:` y el navegador vuelve a intentarlo.
+        """
+        if self.command == 'HEAD':
+            self.send_body(b'', 'text/event-stream; charset=utf-8',
+                           headers={'Cache-Control': 'no-cache', 'Access-Control-Allow-Origin': '*'})
+            return
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        # Sin Content-Length: la respuesta termina al cerrar la conexión
+        self.send_header('Connection', 'close')
+        self.close_connection = True
+        self.end_headers()
+        self.wfile.write(f"retry: {LIVE_RETRY_MS}\n\n".encode('utf-8'))
+        if self.server.live.add(self.request):
+            self.server.detach(self.request)
+    
+    def serve_sessions(self, query):
+        """Sirve una página de sesiones, de la más reciente a la más antigua.
+        
+        Parámetros: game, from y to (días YYYY-MM-DD incluidos), limit y
+        cursor (el next_cursor de la página anterior: se devuelven sesiones
+        con id menor). Solo se recorren las filas hasta completar la página.
+        """
+        def param(name):
+            value = query.get(name, [''])[0].strip()
+            return value or None
+        
+        try:
+            limit = int(param('limit') or SESSIONS_PAGE_SIZE)
+            cursor = param('cursor')
+            cursor = int(cursor) if cursor is not None else None
+            # Solo para validar las fechas
+            date_bounds(param('from'), param('to'))
+        except ValueError:
+            self.send_error(400, "limit and cursor must be integers, from/to dates as YYYY-MM-DD")
+            return
+        limit = max(1, min(limit, SESSIONS_PAGE_MAX))
+        
+        # Se pide una de más para saber si hay otra página
+        rows = self.data_manager.get_sessions_page(limit + 1, cursor, param('game'), param('from'), param('to'))
+        page = [session_from_row(session_id, row) for session_id, row in rows[:limit]]
+        # La siguiente página empieza tras la última enviada
+        next_cursor = page[-1]['id'] if len(rows) > limit else None
+        
+        self.send_json({'sessions': page, 'next_cursor': next_cursor, 'limit': limit})
+    
+    def serve_session_timeline(self, session_id, query):
+        """Sirve el timeline de una sesión reducido a ?points=N tramos"""
+        try:
+            points = int(query.get('points', ['200'])[0])
+        except ValueError:
+            self.send_error(400, "points must be an integer")
+            return
+        points = max(1, min(points, 5000))
+        
+        try:
+            timeline = self.data_manager.get_session_timeline(session_id, points)
+        except Exception as e:
+            self.send_error(500, f"Error loading timeline: {str(e)}")
+            return
+        
+        if timeline is None:
+            self.send_error(404, "Timeline not found")
+            return
+        self.send_json(timeline)
+    
     def load_data_from_csv(self):
         """Carga los datos desde los archivos CSV"""
-        data_dir = "data"
-        games_file = os.path.join(data_dir, "games.csv")
-        sessions_file = os.path.join(data_dir, "sessions.csv")
-        
         # Cargar juegos
-        games = []
-        if os.path.exists(games_file):
-            with open(games_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    games.append({
-                        'name': row.get('game_name', ''),
-                        'genre': row.get('genre', ''),
-                        'date_added': row.get('date_added', ''),
-                        'notes': row.get('notes', '')
-                    })
-        
-        # Cargar sesiones
-        sessions = []
-        if os.path.exists(sessions_file):
-            with open(sessions_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    sessions.append({
-                        'game': row.get('game', ''),
-                        'date': row.get('date', ''),
-                        'duration_seconds': int(row.get('duration_seconds', 0)),
-                        'happy_count': int(row.get('happy_count', 0)),
-                        'angry_count': int(row.get('angry_count', 0)),
-                        'neutral_count': int(row.get('neutral_count', 0)),
-                        'happy_percentage': float(row.get('happy_percentage', 0)),
-                        'angry_percentage': float(row.get('angry_percentage', 0)),
-                        'neutral_percentage': float(row.get('neutral_percentage', 0)),
-                        'peak_rage_count': int(row.get('peak_rage_count', 0)),
-                        'happiness_streaks': int(row.get('happiness_streaks', 0)),
-                        'emotional_trend': row.get('emotional_trend', 'neutral'),
-                        'total_frames': int(row.get('total_frames', 0))
-                    })
+        games = [
+            {
+                'name': record['game_name'],
+                'genre': record.get('genre', ''),
+                'date_added': record.get('date_added', ''),
+                'notes': record.get('notes', '')
+            }
+            for record in self.data_manager.get_game_records()
+        ]
+        
+        # Cargar sesiones del backend configurado (CSV o SQLite); el id es su posición
+        sessions = [
+            session_from_row(session_id, row)
+            for session_id, row in enumerate(self.data_manager.backend.read_sessions(0))
+        ]
         
         # Calcular estadísticas globales
-        global_stats = self.calculate_global_stats(sessions)
+        global_stats = self.calculate_global_stats()
         
         return {
             'games': games,
@@ -109,42 +774,24 @@ class RageTrackerHandler(http.server.SimpleHTTPRequestHandler):
             'export_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
     
-    def calculate_global_stats(self, sessions):
-        """Calcula estadísticas globales desde las sesiones"""
-        if not sessions:
+    def calculate_global_stats(self):
+        """Calcula estadísticas globales con la copia por columnas de las sesiones"""
+        # Cada juego con su nombre registrado, como en aggregate() y /api/stats/games
+        names = {game_key(r['game_name']): r['game_name'] for r in self.data_manager.get_game_records()}
+        game_stats = self.data_manager.analytics().group_by('game', names=names)
+        if not game_stats:
             return {
                 'total_sessions': 0,
                 'total_playtime': 0,
                 'total_rage_moments': 0,
                 'total_happy_moments': 0,
+                'total_neutral_moments': 0,
                 'most_played_game': None,
                 'ragiest_game': None,
                 'happiest_game': None
             }
         
-        total_sessions = len(sessions)
-        total_playtime = sum(s['duration_seconds'] for s in sessions)
-        total_rage = sum(s['angry_count'] for s in sessions)
-        total_happy = sum(s['happy_count'] for s in sessions)
-        
-        # Análisis por juego
-        game_stats = {}
-        for session in sessions:
-            game = session['game']
-            if game not in game_stats:
-                game_stats[game] = {
-                    'playtime': 0,
-                    'rage_sum': 0,
-                    'happy_sum': 0,
-                    'sessions': 0
-                }
-            
-            game_stats[game]['playtime'] += session['duration_seconds']
-            game_stats[game]['rage_sum'] += session['angry_percentage']
-            game_stats[game]['happy_sum'] += session['happy_percentage']
-            game_stats[game]['sessions'] += 1
-        
-        # Calcular promedios
+        # Juegos destacados (el primero en caso de empate)
         most_played = None
         ragiest = None
         happiest = None
@@ -153,53 +800,60 @@ class RageTrackerHandler(http.server.SimpleHTTPRequestHandler):
         max_happy = 0
         
         for game, stats in game_stats.items():
-            avg_rage = stats['rage_sum'] / stats['sessions']
-            avg_happy = stats['happy_sum'] / stats['sessions']
-            
-            if stats['playtime'] > max_playtime:
-                max_playtime = stats['playtime']
+            if stats['total_time'] > max_playtime:
+                max_playtime = stats['total_time']
                 most_played = game
             
-            if avg_rage > max_rage:
-                max_rage = avg_rage
+            if stats['avg_rage_percentage'] > max_rage:
+                max_rage = stats['avg_rage_percentage']
                 ragiest = game
             
-            if avg_happy > max_happy:
-                max_happy = avg_happy
+            if stats['avg_happy_percentage'] > max_happy:
+                max_happy = stats['avg_happy_percentage']
                 happiest = game
         
         return {
-            'total_sessions': total_sessions,
-            'total_playtime': total_playtime,
-            'total_rage_moments': total_rage,
-            'total_happy_moments': total_happy,
+            'total_sessions': sum(s['total_sessions'] for s in game_stats.values()),
+            'total_playtime': sum(s['total_time'] for s in game_stats.values()),
+            'total_rage_moments': sum(s['total_angry'] for s in game_stats.values()),
+            'total_happy_moments': sum(s['total_happy'] for s in game_stats.values()),
+            'total_neutral_moments': sum(s['total_neutral'] for s in game_stats.values()),
             'most_played_game': most_played,
             'ragiest_game': ragiest,
             'happiest_game': happiest
         }
 
 
-def start_server(port=8000):
-    """Inicia el servidor web"""
+def start_server(port=8000, workers=DEFAULT_WORKERS):
+    """Inicia el servidor web (atiende hasta `workers` conexiones a la vez)"""
     handler = RageTrackerHandler
+    handler.data_manager = DataManager()
     
-    with socketserver.TCPServer(("", port), handler) as httpd:
+    with PooledHTTPServer(("", port), handler, workers) as httpd:
         print("\n" + "=" * 60)
         print("  🎮 RAGE TRACKER - Dashboard Server")
         print("=" * 60)
-        print(f"\n✅ Servidor iniciado en http://localhost:{port}")
+        print(f"\n✅ Servidor iniciado en http://localhost:{port} ({workers} workers)")
         print(f"\n📊 Accede al dashboard en:")
         print(f"   → http://localhost:{port}/dashboard")
         print(f"\n💾 API de datos disponible en:")
         print(f"   → http://localhost:{port}/api/data")
+        print(f"   → http://localhost:{port}/api/stats/overview")
+        print(f"   → http://localhost:{port}/api/stats/games")
+        print(f"   → http://localhost:{port}/api/stats/series?bucket=day")
+        print(f"   → http://localhost:{port}/api/games/<nombre>/stats")
+        print(f"   → http://localhost:{port}/api/sessions?game=&from=&to=&limit=50&cursor=")
+        print(f"   → http://localhost:{port}/api/sessions/<id>/timeline?points=200")
+        print(f"   → http://localhost:{port}/api/live (en vivo, Server-Sent Events)")
         print(f"\n⚠️  Presiona Ctrl+C para detener el servidor\n")
         print("=" * 60 + "\n")
         
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
-            print("\n\n👋 Servidor detenido. ¡Hasta luego!")
-            httpd.shutdown()
+            print("\n\n⏳ Terminando peticiones en curso...")
+            httpd.drain()
+            print("👋 Servidor detenido. ¡Hasta luego!")
 
 
 if __name__ == "__main__":
@@ -223,4 +877,12 @@ if __name__ == "__main__":
         except ValueError:
             print(f"⚠️  Puerto inválido: {sys.argv[1]}. Usando puerto 8000.")
     
-    start_server(port)
+    # Segundo argumento opcional: número de workers
+    workers = DEFAULT_WORKERS
+    if len(sys.argv) > 2:
+        try:
+            workers = max(1, int(sys.argv[2]))
+        except ValueError:
+            print(f"⚠️  Número de workers inválido: {sys.argv[2]}. Usando {DEFAULT_WORKERS}.")
+    
+    start_server(port, workers)